@@ -1,13 +1,17 @@
 import time
-import tracemalloc
+
+import instrument
+from moves import run_moves
 
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
         
     def set_queens(self, queens):
@@ -32,9 +36,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -51,7 +55,7 @@ class EightQueens:
     
     def place_queen(self, row, col):
         """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
@@ -64,6 +68,8 @@ class EightQueens:
         return self.queens
 
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -150,37 +156,70 @@ def run_test_cases():
 
 def is_safe(queens, row, col):
     """Check if placing a queen at (row, col) is safe"""
+    if instrument.ENABLED:
+        instrument.counters["evaluations"] += 1
     for r in range(row):
         c = queens[r]
         if c == col or abs(r - row) == abs(c - col):
             return False
     return True
 
-def dfs_algorithm(eq):
-    """DFS algorithm to solve 8-queens problem"""
-    current_state = [-1] * 8
+def dfs_algorithm(eq, budget=None):
+    """DFS algorithm to solve the N-queens problem"""
+    return run_moves(dfs_moves(eq, budget), print_dfs_move)
+
+def print_dfs_move(row, old_col, new_col):
+    if new_col != -1:
+        print(f"Place queen at row {row}, column {new_col} (queens[{row}] = {new_col})")
+    else:
+        print(f"Backtrack from row {row}, column {old_col}")
+
+def dfs_moves(eq, budget=None):
+    """Generator version of dfs_algorithm: yields placements and backtracks, returns the final list"""
+    n = len(eq.queens)
+    current_state = [-1] * n
+    board = eq.queens[:] # the input board with every move so far applied
     
     def dfs_recursive(row):
-        if row >= 8:
+        if row >= n:
             return current_state[:]
         
-        for col in range(8):
+        for col in range(n):
+            if instrument.ENABLED:
+                instrument.counters["nodes"] += 1
+            if budget is not None and (budget.node() or budget.evaluation()):
+                return None
             if is_safe(current_state, row, col):
                 current_state[row] = col
+                board[row] = col
                 eq.move_count += 1
-                print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+                yield (row, -1, col)
                 
-                result = dfs_recursive(row + 1)
+                result = yield from dfs_recursive(row + 1)
                 if result:
                     return result
+                if budget is not None and budget.exhausted:
+                    return None
                 
                 current_state[row] = -1
+                board[row] = -1
                 eq.move_count += 1
-                print(f"Backtrack from row {row}, column {col}")
+                if instrument.ENABLED:
+                    instrument.counters["backtracks"] += 1
+                yield (row, col, -1)
         
         return None
     
-    solution = dfs_recursive(0)
+    solution = yield from dfs_recursive(0)
+    if not solution and budget is not None and budget.exhausted:
+        # out of budget: fill the rows not reached yet with the initial queens
+        budget.offer(eq.queens)
+        budget.offer([col if col != -1 else eq.queens[row] for row, col in enumerate(current_state)])
+        for row, col in enumerate(budget.best_queens):
+            if board[row] != col:
+                eq.move_count += 1
+                yield (row, board[row], col)
+        return budget.best_queens
     return solution if solution else current_state
   
 if __name__ == "__main__":
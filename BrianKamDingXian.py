@@ -1,14 +1,19 @@
+import sys
 import time
-import tracemalloc
 import heapq
 
+import instrument
+from moves import run_moves
+
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
         
     def set_queens(self, queens):
@@ -33,9 +38,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -50,20 +55,42 @@ class EightQueens:
             print(f"Test Case {test_case_no} Result: LOSE ❌")
             return False
     
-    def place_queen(self, row, col):
-        """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+    def move_queen(self, row, col):
+        """Place or move a queen without printing, return the move (row, old column, new column)"""
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
-            if original_col != -1 and original_col != col:
-                print(f"Move queen from row {row+1}, column {original_col+1} to column {col+1} (queens[{row}] = {col})")
-            else:
-                print(f"Place queen at row {row+1}, column {col+1} (queens[{row+1}] = {col+1})")
+            return (row, original_col, col)
+
+    def print_move(self, row, original_col, col):
+        if original_col != -1 and original_col != col:
+            print(f"Move queen from row {row+1}, column {original_col+1} to column {col+1} (queens[{row}] = {col})")
+        else:
+            print(f"Place queen at row {row+1}, column {col+1} (queens[{row+1}] = {col+1})")
+
+    def place_queen(self, row, col):
+        """Place or move a queen to a specified column in a given row"""
+        move = self.move_queen(row, col)
+        if move is not None:
+            self.print_move(*move)
 
     def get_solution_list(self):
         return self.queens
 
+def successor_moves(queens):
+    """The moves from a state to its neighbors as (row, old column, new column)
+
+    Unplaced queens (-1) can be placed in any column of their row, placed
+    queens move to any other column of their row.
+    """
+    n = len(queens)
+    for row in range(n):
+        initial_col = queens[row]
+        for col in range(n):
+            if col != initial_col: # avoid moving to same column
+                yield row, initial_col, col
+
 # A* node class
 class AStarNode:
     def __init__(self, queens, g_cost, move_sequence=None):
@@ -75,10 +102,12 @@ class AStarNode:
     
     def calculate_heuristic(self):
         """Count conflicts between all queens"""
+        if instrument.ENABLED:
+            instrument.counters["evaluations"] += 1
         conflicts = 0
-        n = len(self.queens) # can remove if all 8 queens are always on board
+        n = len(self.queens) # can remove if all N queens are always on board
         
-        for i in range(n): # n = 8
+        for i in range(n):
              # can be removed
             if self.queens[i] == -1:
                 conflicts += 3 # penalty for unplaced queen 
@@ -105,26 +134,11 @@ class AStarNode:
     def get_neighbors(self):
         """Generate all the next possible moves for queens (neighbors)"""
         neighbors = [] # list of neighbor nodes
-        
-        # iterate each row to find placed and unplaced queens 
-        for row in range(8):
-            # can be removed
-            if self.queens[row] == -1:
-                # Place unplaced queen
-                for col in range(8):
-                    new_queens = self.queens[:]
-                    new_queens[row] = col
-                    new_move_sequence = self.move_sequence + [(row, self.queens[row], col)]
-                    neighbors.append(AStarNode(new_queens, self.g_cost + 1, new_move_sequence))
-            else:
-                initial_col = self.queens[row] # initial column
-                # move queens to other columns in same row
-                for col in range(8):
-                    if col != initial_col: # avoid moving to same column
-                        new_queens = self.queens[:] # copy current queens state
-                        new_queens[row] = col # move queen to new column
-                        new_move_sequence = self.move_sequence + [(row, initial_col, col)] # record move
-                        neighbors.append(AStarNode(new_queens, self.g_cost + 1, new_move_sequence)) # create new node
+        for row, initial_col, col in successor_moves(self.queens):
+            new_queens = self.queens[:] # copy current queens state
+            new_queens[row] = col # move queen to new column
+            new_move_sequence = self.move_sequence + [(row, initial_col, col)] # record move
+            neighbors.append(AStarNode(new_queens, self.g_cost + 1, new_move_sequence)) # create new node
         
         return neighbors
     
@@ -143,9 +157,35 @@ class AStarNode:
         """Hash function for using in sets and dictionaries"""
         return hash(tuple(self.queens)) # easy way create unique hash for queens position
 
+def sample_memory(step, open_set, closed_set, visited_states):
+    """Record the entries and estimated bytes of the A* structures (see instrument.sample)
+
+    Every node is taken to be the size of the last one pushed and every state
+    key the size of one visited key, so a sample costs O(1) however big the
+    search is. The move tuples are shared with the parent, only the newest counts.
+    """
+    key_bytes = sys.getsizeof(next(iter(visited_states)))
+    node_bytes = 0
+    if open_set:
+        node = open_set[-1]
+        node_bytes = (sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.queens)
+                      + sys.getsizeof(node.move_sequence))
+        if node.move_sequence:
+            node_bytes += sys.getsizeof(node.move_sequence[-1])
+    instrument.sample(
+        step,
+        open_set=(len(open_set), sys.getsizeof(open_set) + len(open_set) * node_bytes),
+        closed_set=(len(closed_set), sys.getsizeof(closed_set) + len(closed_set) * key_bytes),
+        visited_states=(len(visited_states), sys.getsizeof(visited_states) + len(visited_states) * key_bytes),
+    )
+
 # A* Search Algorithm for 8 Queens Problem
-def astar_search(eq):
+def astar_search(eq, budget=None):
     """A* search implementation for 8 Queens problem"""
+    return run_moves(astar_moves(eq, budget), eq.print_move)
+
+def astar_moves(eq, budget=None):
+    """Generator version of astar_search: yields the moves of the path it found"""
     initial_state = AStarNode(eq.queens, 0) # initial state with g_cost = 0
     
     if initial_state.is_goal(): # skip if solved
@@ -154,6 +194,7 @@ def astar_search(eq):
     open_set = [initial_state] # priority queue
     closed_set = set() # explored states
     visited_states = {tuple(initial_state.queens): 0} # dictionary to track visited states and their costs
+    best_node = initial_state # fewest conflicts so far, used if the search stops early
     
     max_iterations = 10000  # prevent infinite loops
     iteration = 0
@@ -164,8 +205,10 @@ def astar_search(eq):
         
         # if goal is found, update the board with solution(move sequence)
         if current.is_goal():
+            if instrument.SAMPLE_EVERY and len(closed_set) % instrument.SAMPLE_EVERY:
+                sample_memory(len(closed_set), open_set, closed_set, visited_states)
             for row, old_col, new_col in current.move_sequence: # old_col is placeholder
-                eq.place_queen(row, new_col)
+                yield eq.move_queen(row, new_col)
             return
         
         current_tuple = tuple(current.queens) # convert to tuple for explored state set
@@ -173,9 +216,22 @@ def astar_search(eq):
             continue
         
         closed_set.add(current_tuple)
+        if instrument.ENABLED:
+            instrument.counters["nodes"] += 1
+        if instrument.SAMPLE_EVERY and len(closed_set) % instrument.SAMPLE_EVERY == 0:
+            sample_memory(len(closed_set), open_set, closed_set, visited_states)
+        
+        if budget is not None and budget.node():
+            break
         
         # generate neighbors
-        for neighbor in current.get_neighbors():
+        neighbors = current.get_neighbors()
+        if instrument.ENABLED:
+            instrument.counters["neighbors"] += len(neighbors)
+        for neighbor in neighbors:
+            if neighbor.h_cost < best_node.h_cost:
+                best_node = neighbor
+            
             neighbor_tuple = tuple(neighbor.queens) # convert to tuple for easy compare
             
             # skip if neighbor already visited with a better or equal cost
@@ -188,8 +244,21 @@ def astar_search(eq):
             
             visited_states[neighbor_tuple] = neighbor.g_cost
             heapq.heappush(open_set, neighbor)
+        
+        if budget is not None and budget.evaluation(len(neighbors)):
+            break
+    
+    if instrument.SAMPLE_EVERY and len(closed_set) % instrument.SAMPLE_EVERY: # the last state, if not sampled yet
+        sample_memory(len(closed_set), open_set, closed_set, visited_states)
+    # no goal found within the iteration limit or budget: move to the best node instead
+    if budget is not None:
+        budget.offer(best_node.queens, best_node.h_cost // 2) # h cost counts 2 per attacking pair
+    for row, old_col, new_col in best_node.move_sequence:
+        yield eq.move_queen(row, new_col)
 
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -1,15 +1,19 @@
 import time
-import tracemalloc
-import random
 import math
 
+import instrument
+from moves import run_moves
+from rng import as_random
+
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
 
     def set_queens(self, queens):
@@ -34,9 +38,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -51,22 +55,33 @@ class EightQueens:
             print(f"Test Case {test_case_no} Result: LOSE ❌")
             return False
 
-    def place_queen(self, row, col):
-        """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+    def move_queen(self, row, col):
+        """Place or move a queen without printing, return the move (row, old column, new column)"""
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
-            if original_col != -1 and original_col != col:
-                print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
-            else:
-                print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+            return (row, original_col, col)
+
+    def print_move(self, row, original_col, col):
+        if original_col != -1 and original_col != col:
+            print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
+        else:
+            print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+
+    def place_queen(self, row, col):
+        """Place or move a queen to a specified column in a given row"""
+        move = self.move_queen(row, col)
+        if move is not None:
+            self.print_move(*move)
 
     def get_solution_list(self):
         return self.queens
 
 def conflict_count(queens):
     """Count number of pairs of queens attacking each other."""
+    if instrument.ENABLED:
+        instrument.counters["evaluations"] += 1
     conflicts = 0
     n = len(queens)
     for i in range(n):
@@ -75,24 +90,49 @@ def conflict_count(queens):
                 conflicts += 1
     return conflicts
 
-def simulated_annealing(eq):
+def simulated_annealing(eq, budget=None, rng=None):
+    """Simulated annealing, rng is a random.Random, NumPy Generator or seed (global random by default)"""
+    return run_moves(simulated_annealing_moves(eq, budget, rng), eq.print_move)
+
+def simulated_annealing_moves(eq, budget=None, rng=None):
+    """Generator version of simulated_annealing that yields every accepted move"""
+    rng = as_random(rng)
     temp = 1000.0       # start temperature
     cooling = 0.99     # slow cooling for better exploration
     min_temp = 0.001
     max_steps = 10000
 
+    n = len(eq.queens)
     current = eq.queens[:] #copy of current queen positions
     current_conflicts = conflict_count(current) #num of conflicts in current state
+    if budget is not None:
+        budget.offer(current, current_conflicts)
 
     for step in range(max_steps):
         if current_conflicts == 0:
             break
+        if instrument.ENABLED:
+            instrument.counters["nodes"] += 1
+        if budget is not None and (budget.node() or budget.evaluation()):
+            # out of budget: go back to the best state seen instead of the current one
+            for row, col in enumerate(budget.best_queens):
+                if current[row] == col:
+                    continue
+                if col == -1:
+                    # move_queen only places queens, take this one off by hand
+                    eq.queens[row] = -1
+                    eq.move_count += 1
+                    yield (row, current[row], -1)
+                else:
+                    yield eq.move_queen(row, col)
+            current = budget.best_queens[:]
+            break
 
         # choose a random row and new column
-        row = random.randint(0, 7)
-        col = random.randint(0, 7)
+        row = rng.randint(0, n - 1)
+        col = rng.randint(0, n - 1)
         while col == current[row]:
-            col = random.randint(0, 7)
+            col = rng.randint(0, n - 1)
 
         new_state = current[:]
         new_state[row] = col
@@ -100,10 +140,16 @@ def simulated_annealing(eq):
 
         conflict_change = current_conflicts - new_conflicts
 
-        if conflict_change > 0 or random.random() < math.exp(conflict_change / temp):
+        if conflict_change > 0 or rng.random() < math.exp(conflict_change / temp):
             current = new_state
             current_conflicts = new_conflicts
-            eq.place_queen(row, col)
+            if instrument.ENABLED:
+                instrument.counters["sa_accepted"] += 1
+            yield eq.move_queen(row, col)
+            if budget is not None:
+                budget.offer(current, current_conflicts)
+        elif instrument.ENABLED:
+            instrument.counters["sa_rejected"] += 1
 
         temp *= cooling
         if temp < min_temp:
@@ -112,6 +158,8 @@ def simulated_annealing(eq):
     eq.set_queens(current)
 
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -1,17 +1,23 @@
 import time
-import tracemalloc
-import random
-import numpy as np
-from typing import List, Tuple
+import heapq
+import math
+from array import array
+
+import instrument
+from moves import run_moves
+from rng import as_random
 
 # Genetic Algorithm Parameters
 POP_SIZE = 100
 MAX_GENERATIONS = 1000
 MUTATION_RATE = 0.1
 CROSSOVER_RATE = 0.8
+STEADY_OFFSPRING = 4 # children per step of the steady-state GA
 
 def fitness(chromosome):
-    """Calculate fitness for 8-Queens problem. Higher fitness = fewer conflicts."""
+    """Calculate fitness for N-Queens problem. Higher fitness = fewer conflicts."""
+    if instrument.ENABLED:
+        instrument.counters["evaluations"] += 1
     conflicts = 0
     n = len(chromosome)
     
@@ -28,24 +34,26 @@ def fitness(chromosome):
     max_pairs = n * (n - 1) // 2  # 28 for n=8
     return max_pairs - conflicts
 
-def select(population):
+def select(population, rng=None):
     """Tournament selection - select two parents."""
+    rng = as_random(rng)
     def tournament_select():
         tournament_size = 3
-        tournament = random.sample(population, min(tournament_size, len(population)))
+        tournament = rng.sample(population, min(tournament_size, len(population)))
         return max(tournament, key=lambda x: fitness(x))
     
     parent1 = tournament_select()
     parent2 = tournament_select()
     return parent1, parent2
 
-def crossover(parent1, parent2):
+def crossover(parent1, parent2, rng=None):
     """Order crossover (OX) - preserves relative order."""
-    if random.random() > CROSSOVER_RATE:
+    rng = as_random(rng)
+    if rng.random() > CROSSOVER_RATE:
         return parent1.copy()
     
     size = len(parent1)
-    start, end = sorted(random.sample(range(size), 2))
+    start, end = sorted(rng.sample(range(size), 2))
     
     # Create offspring
     offspring = [-1] * size
@@ -61,8 +69,8 @@ def crossover(parent1, parent2):
             remaining.append(x)
             used_elements.add(x)
     
-    # If we don't have enough unique elements, fill with missing values 0-7
-    all_values = set(range(8))
+    # If we don't have enough unique elements, fill with missing values 0..N-1
+    all_values = set(range(size))
     missing_values = list(all_values - used_elements)
     remaining.extend(missing_values)
     
@@ -74,35 +82,38 @@ def crossover(parent1, parent2):
                 offspring[i] = remaining[j]
                 j += 1
             else:
-                # Fallback: use any remaining value from 0-7
-                for val in range(8):
+                # Fallback: use any remaining value from 0..N-1
+                for val in range(size):
                     if offspring.count(val) == 0:
                         offspring[i] = val
                         break
     
     return offspring
 
-def mutate(chromosome):
+def mutate(chromosome, rng=None):
     """Swap mutation - swap two random positions."""
-    if random.random() < MUTATION_RATE:
+    rng = as_random(rng)
+    if rng.random() < MUTATION_RATE:
         chromosome = chromosome.copy()
-        i, j = random.sample(range(len(chromosome)), 2)
+        i, j = rng.sample(range(len(chromosome)), 2)
         chromosome[i], chromosome[j] = chromosome[j], chromosome[i]
     return chromosome
 
-def create_random_chromosome():
-    """Create a random chromosome (permutation of 0-7)."""
-    chromosome = list(range(8))
-    random.shuffle(chromosome)
+def create_random_chromosome(n=8, rng=None):
+    """Create a random chromosome (permutation of 0..n-1)."""
+    chromosome = list(range(n))
+    as_random(rng).shuffle(chromosome)
     return chromosome
 
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
         
     def set_queens(self, queens):
@@ -128,9 +139,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -145,16 +156,25 @@ class EightQueens:
             print(f"Test Case {test_case_no} Result: LOSE ❌")
             return False
     
-    def place_queen(self, row, col):
-        """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+    def move_queen(self, row, col):
+        """Place or move a queen without printing, return the move (row, old column, new column)"""
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
-            if original_col != -1 and original_col != col:
-                print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
-            else:
-                print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+            return (row, original_col, col)
+
+    def print_move(self, row, original_col, col):
+        if original_col != -1 and original_col != col:
+            print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
+        else:
+            print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+
+    def place_queen(self, row, col):
+        """Place or move a queen to a specified column in a given row"""
+        move = self.move_queen(row, col)
+        if move is not None:
+            self.print_move(*move)
 
     def move_queens_to_solution(self, target_solution, show_moves=True):
         """Move queens step by step from current position to target solution"""
@@ -162,7 +182,7 @@ class EightQueens:
             print(f"\n--- Moving queens to solution: {target_solution} ---")
             
         moves_made = 0
-        for row in range(8):
+        for row in range(self.n):
             if self.queens[row] != target_solution[row]:
                 if show_moves:
                     self.place_queen(row, target_solution[row])
@@ -183,7 +203,188 @@ class EightQueens:
     def get_solution_list(self):
         return self.queens
 
+def genetic_algorithm(eq, budget=None, rng=None):
+    """Run the genetic algorithm and move the queens of eq to the best chromosome found
+
+    rng: random.Random, NumPy Generator or seed, the global random module by default
+    """
+    return run_moves(genetic_moves(eq, budget, log=print, rng=rng), eq.print_move)
+
+def genetic_moves(eq, budget=None, log=None, rng=None):
+    """Generator version of genetic_algorithm: yields the moves to the best chromosome
+
+    Progress messages go to log (e.g. print) if given, returns the best chromosome.
+    """
+    rng = as_random(rng)
+    if log:
+        log(f"Initial fitness: {fitness(eq.queens)}")
+
+    n = len(eq.queens)
+    max_fitness = n * (n - 1) // 2 # no attacking pairs (28 for n=8)
+
+    # Initialize population with current test case and random chromosomes
+    population = [eq.queens.copy()]  # Include the test case
+    for _ in range(POP_SIZE - 1):
+        population.append(create_random_chromosome(n, rng))
+
+    best_solution = eq.queens.copy()
+    best_fitness = fitness(eq.queens)
+    generation_found = 0
+
+    for generation in range(MAX_GENERATIONS):
+        if instrument.ENABLED:
+            instrument.counters["generations"] += 1
+        if budget is not None:
+            budget.offer(best_solution, max_fitness - best_fitness)
+            if budget.node():
+                if log:
+                    log(f"Budget exhausted, best solution (fitness {best_fitness}) in generation {generation_found}: {best_solution}")
+                break
+
+        # Sort population by fitness (best first)
+        population = sorted(population, key=lambda x: fitness(x), reverse=True)
+
+        current_best_fitness = fitness(population[0])
+        if current_best_fitness > best_fitness:
+            best_fitness = current_best_fitness
+            best_solution = population[0].copy()
+            generation_found = generation
+
+        # Check if solution found (fitness = max_fitness means no conflicts)
+        if best_fitness == max_fitness:
+            if log:
+                log(f"Perfect solution found in generation {generation}: {best_solution}")
+            break
+
+        # Elitism - keep top 10% of population
+        elite_size = max(1, POP_SIZE // 10)
+        new_population = population[:elite_size]
+
+        # Generate rest of population through crossover and mutation
+        while len(new_population) < POP_SIZE:
+            parent1, parent2 = select(population, rng)
+            child = crossover(parent1, parent2, rng)
+            child = mutate(child, rng)
+            new_population.append(child)
+        if instrument.ENABLED:
+            instrument.counters["neighbors"] += POP_SIZE - elite_size
+
+        population = new_population
+        if budget is not None:
+            # sorting + best check + two tournaments of 3 for each child
+            budget.evaluation(len(population) + 1 + 6 * (POP_SIZE - elite_size))
+    else:
+        if log:
+            log(f"Best solution found (fitness {best_fitness}) in generation {generation_found}: {best_solution}")
+
+    yield from moves_to_solution(eq, best_solution, log)
+    return best_solution
+
+def moves_to_solution(eq, solution, log=None):
+    """Move queens step by step to the solution (as move_queens_to_solution does), yielding the moves"""
+    if log:
+        log(f"\n--- Moving queens to solution: {solution} ---")
+    moves_made = 0
+    for row in range(len(eq.queens)):
+        if eq.queens[row] != solution[row]:
+            move = eq.move_queen(row, solution[row])
+            if move is not None:
+                yield move
+            moves_made += 1
+    if log:
+        log("No moves needed - already at target solution!" if moves_made == 0 else f"--- Completed {moves_made} moves ---")
+
+def steady_state_genetic_algorithm(eq, budget=None, rng=None):
+    """Steady-state genetic algorithm: a few children per step replace the worst members
+
+    rng: random.Random, NumPy Generator or seed, the global random module by default
+    """
+    return run_moves(steady_state_moves(eq, budget, log=print, rng=rng), eq.print_move)
+
+def steady_state_moves(eq, budget=None, log=None, rng=None, pop_size=POP_SIZE, offspring=STEADY_OFFSPRING,
+                       max_steps=None):
+    """Generator version of steady_state_genetic_algorithm: yields the moves to the best chromosome
+
+    Every member is evaluated once, when it joins the population, and its
+    fitness is kept next to it. A min-heap of (fitness, age, index) gives the
+    worst member in O(1); a child only replaces it if it is fitter and not
+    already in the population (checked on the packed chromosome). The default
+    max_steps makes the same number of children as the generational loop.
+    """
+    rng = as_random(rng)
+    n = len(eq.queens)
+    max_fitness = n * (n - 1) // 2
+    max_steps = max_steps if max_steps is not None else MAX_GENERATIONS * pop_size // offspring
+
+    def pack(chromosome):
+        return array("i", chromosome).tobytes()
+
+    population = [eq.queens.copy()] # include the test case
+    packed = {pack(eq.queens)}
+    # small boards have fewer than pop_size distinct permutations (13! is more than any population)
+    size = pop_size if n > 12 else min(pop_size, math.factorial(n))
+    while len(population) < size:
+        chromosome = create_random_chromosome(n, rng)
+        if pack(chromosome) not in packed:
+            population.append(chromosome)
+            packed.add(pack(chromosome))
+    scores = [fitness(chromosome) for chromosome in population]
+    worst = [(score, age, index) for age, (index, score) in enumerate(enumerate(scores))]
+    heapq.heapify(worst)
+    age = len(population)
+
+    best = max(range(len(population)), key=scores.__getitem__)
+    best_solution, best_fitness = population[best].copy(), scores[best]
+    if log:
+        log(f"Initial fitness: {scores[0]}")
+
+    def tournament():
+        contenders = rng.sample(range(len(population)), min(3, len(population)))
+        return population[max(contenders, key=scores.__getitem__)]
+
+    step_found = 0
+    for step in range(max_steps):
+        if best_fitness == max_fitness:
+            if log:
+                log(f"Perfect solution found in step {step_found}: {best_solution}")
+            break
+        if instrument.ENABLED:
+            instrument.counters["generations"] += 1
+            instrument.counters["neighbors"] += offspring
+        if budget is not None:
+            budget.offer(best_solution, max_fitness - best_fitness)
+            if budget.node() or budget.evaluation(offspring):
+                if log:
+                    log(f"Budget exhausted, best solution (fitness {best_fitness}) in step {step_found}: {best_solution}")
+                break
+
+        for _ in range(offspring):
+            child = mutate(crossover(tournament(), tournament(), rng), rng)
+            key = pack(child)
+            if key in packed:
+                continue
+            score = fitness(child)
+            if score <= worst[0][0]:
+                continue
+            index = heapq.heapreplace(worst, (score, age, worst[0][2]))[2]
+            age += 1
+            packed.discard(pack(population[index]))
+            packed.add(key)
+            population[index] = child
+            scores[index] = score
+            if score > best_fitness:
+                best_solution, best_fitness = child.copy(), score
+                step_found = step
+    else:
+        if log:
+            log(f"Best solution found (fitness {best_fitness}) in step {step_found}: {best_solution}")
+
+    yield from moves_to_solution(eq, best_solution, log)
+    return best_solution
+
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -219,50 +420,8 @@ def run_test_cases():
         start_time = time.perf_counter()
 
         # Genetic Algorithm Implementation
-        print(f"Initial fitness: {fitness(case)}")
-        
-        # Initialize population with current test case and random chromosomes
-        population = [case.copy()]  # Include the test case
-        for _ in range(POP_SIZE - 1):
-            population.append(create_random_chromosome())
-
-        best_solution = case.copy()
-        best_fitness = fitness(case)
-        generation_found = 0
-
-        for generation in range(MAX_GENERATIONS):
-            # Sort population by fitness (best first)
-            population = sorted(population, key=lambda x: fitness(x), reverse=True)
-            
-            current_best_fitness = fitness(population[0])
-            if current_best_fitness > best_fitness:
-                best_fitness = current_best_fitness
-                best_solution = population[0].copy()
-                generation_found = generation
-            
-            # Check if solution found (fitness = 28 means no conflicts)
-            if best_fitness == 28:
-                print(f"Perfect solution found in generation {generation}: {best_solution}")
-                break
-
-            # Elitism - keep top 10% of population
-            elite_size = max(1, POP_SIZE // 10)
-            new_population = population[:elite_size]
-
-            # Generate rest of population through crossover and mutation
-            while len(new_population) < POP_SIZE:
-                parent1, parent2 = select(population)
-                child = crossover(parent1, parent2)
-                child = mutate(child)
-                new_population.append(child)
+        genetic_algorithm(eq)
 
-            population = new_population
-        else:
-            print(f"Best solution found (fitness {best_fitness}) in generation {generation_found}: {best_solution}")
-
-        # Move queens step by step to the solution
-        moves_made = eq.move_queens_to_solution(best_solution, show_moves=True)
-        
         eq.display_board(isInitial=False)
 
         # end memory and time tracking
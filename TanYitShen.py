@@ -1,13 +1,17 @@
 import time
-import tracemalloc
+
+import instrument
+from moves import run_moves
 
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
         
     def set_queens(self, queens):
@@ -32,9 +36,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -49,55 +53,101 @@ class EightQueens:
             print(f"Test Case {test_case_no} Result: LOSE ❌")
             return False
     
-    def place_queen(self, row, col):
-        """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+    def move_queen(self, row, col):
+        """Place or move a queen without printing, return the move (row, old column, new column)"""
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
-            if original_col != -1 and original_col != col:
-                print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
-            else:
-                print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+            return (row, original_col, col)
+
+    def print_move(self, row, original_col, col):
+        if original_col != -1 and original_col != col:
+            print(f"Move queen from row {row}, column {original_col} to column {col} (queens[{row}] = {col})")
+        else:
+            print(f"Place queen at row {row}, column {col} (queens[{row}] = {col})")
+
+    def place_queen(self, row, col):
+        """Place or move a queen to a specified column in a given row"""
+        move = self.move_queen(row, col)
+        if move is not None:
+            self.print_move(*move)
 
     def get_solution_list(self):
         return self.queens
 
-def backtracking_alg(eq, row=0, fixed_queens=None):
-    if row >= 8:
+def backtracking_alg(eq, row=0, fixed_queens=None, budget=None):
+    """Backtracking search that prints every move, see backtracking_moves"""
+    return run_moves(backtracking_moves(eq, row, fixed_queens, budget), eq.print_move)
+
+def backtracking_moves(eq, row=0, fixed_queens=None, budget=None):
+    """Generator version of backtracking_alg: yields the moves, returns True if solved"""
+    n = len(eq.queens)
+    if row >= n:
         return True
         
     if fixed_queens is None:
         # identify fixed queens (non-negative initial positions)
         fixed_queens = [col if col != -1 else -1 for col in eq.queens]
+        if budget is not None:
+            budget.offer(eq.queens)
+            solved = yield from backtracking_moves(eq, row, fixed_queens, budget)
+            if not solved and budget.exhausted:
+                # out of budget: keep the better of the input and the current partial search
+                budget.offer(eq.queens)
+                for r, col in enumerate(budget.best_queens):
+                    if eq.queens[r] != col and col != -1:
+                        yield eq.move_queen(r, col)
+            return solved
     
     # if current row has fixed queen
     if fixed_queens[row] != -1:
         # keep fixed position if safe
+        if budget is not None and budget.evaluation():
+            return False
         if is_safe(eq.queens, row, fixed_queens[row]):
-            if backtracking_alg(eq, row + 1, fixed_queens):
+            if (yield from backtracking_moves(eq, row + 1, fixed_queens, budget)):
                 return True
         # if fixed position is invalid, move it to safe square
-        for col in range(8):
+        for col in range(n):
             if col == fixed_queens[row]:
                 continue  # skip original position
+            if instrument.ENABLED:
+                instrument.counters["nodes"] += 1
+            if budget is not None and (budget.node() or budget.evaluation()):
+                return False
             if is_safe(eq.queens, row, col):
-                eq.place_queen(row, col)
-                if backtracking_alg(eq, row + 1, fixed_queens):
+                yield eq.move_queen(row, col)
+                if (yield from backtracking_moves(eq, row + 1, fixed_queens, budget)):
                     return True
-                eq.place_queen(row, fixed_queens[row])  # reset queen position
+                if budget is not None and budget.exhausted:
+                    return False
+                if instrument.ENABLED:
+                    instrument.counters["backtracks"] += 1
+                yield eq.move_queen(row, fixed_queens[row])  # reset queen position
         return False
     
     # for non-fixed queens
-    for col in range(8):
+    for col in range(n):
+        if instrument.ENABLED:
+            instrument.counters["nodes"] += 1
+        if budget is not None and (budget.node() or budget.evaluation()):
+            return False
         if is_safe(eq.queens, row, col):
-            eq.place_queen(row, col)
-            if backtracking_alg(eq, row + 1, fixed_queens):
+            yield eq.move_queen(row, col)
+            if (yield from backtracking_moves(eq, row + 1, fixed_queens, budget)):
                 return True
-            eq.place_queen(row, -1)  # undo queen placement (backtrack)
+            if budget is not None and budget.exhausted:
+                return False
+            if instrument.ENABLED:
+                instrument.counters["backtracks"] += 1
+            # backtrack: no undo move needed, the next column overwrites this row
+            # and is_safe only looks at the rows above
     return False
 
 def is_safe(queens, row, col):
+    if instrument.ENABLED:
+        instrument.counters["evaluations"] += 1
     for r in range(row):
         c = queens[r]
         if c == -1:
@@ -107,6 +157,8 @@ def is_safe(queens, row, col):
     return True
 
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -1,13 +1,17 @@
 import time
-import tracemalloc
+
+import instrument
+from moves import run_moves
 
 class EightQueens:
-    def __init__(self, queens=None):
+    def __init__(self, queens=None, n=8):
         # if queens not given, initialize with -1 meaning empty
-        self.queens = [-1] * 8
+        # the board is N x N with N = len(queens) (8 unless given otherwise)
+        self.n = len(queens) if queens else n
+        self.queens = [-1] * self.n
         self.move_count = 0
         if queens:
-            for i in range(min(len(queens), 8)):
+            for i in range(min(len(queens), self.n)):
                 self.queens[i] = queens[i]
         
     def set_queens(self, queens):
@@ -32,9 +36,9 @@ class EightQueens:
     def display_board(self, isInitial):
         """Display the chessboard with current queen positions"""
         print("\nInitial Board:" if isInitial else "\nFinal Board:")
-        self.board = [['.' for _ in range(8)] for _ in range(8)]
+        self.board = [['.' for _ in range(self.n)] for _ in range(self.n)]
         for row, col in enumerate(self.queens):
-            if 0 <= col < 8:
+            if 0 <= col < self.n:
                 self.board[row][col] = 'Q'
         for row in self.board:
             print(' '.join(row))
@@ -51,7 +55,7 @@ class EightQueens:
     
     def place_queen(self, row, col):
         """Place or move a queen to a specified column in a given row"""
-        if 0 <= row < 8 and 0 <= col < 8:
+        if 0 <= row < self.n and 0 <= col < self.n:
             original_col = self.queens[row]
             self.queens[row] = col
             self.move_count += 1
@@ -64,6 +68,8 @@ class EightQueens:
         return self.queens
 
 def run_test_cases():
+    import tracemalloc
+
     # queens[i] = j --> queen at row i, column j.
     test_cases = [
         [0, 1, 2, 3, 4, 5, 6, 7],
@@ -149,9 +155,12 @@ def run_test_cases():
     print()
 
 def heuristic (queens):
+    if instrument.ENABLED:
+        instrument.counters["evaluations"] += 1
     conflicts = 0
-    for row in range(8):   
-        for col in range(row+1,8):
+    n = len(queens)
+    for row in range(n):   
+        for col in range(row+1,n):
             if queens[row] == queens[col]:
                 conflicts += 1
             elif abs(queens[row] - queens[col]) == abs(row - col):
@@ -159,7 +168,14 @@ def heuristic (queens):
 
     return conflicts
 
-def steepest_ascent_hill_climbing(eq):
+def steepest_ascent_hill_climbing(eq, budget=None):
+    return run_moves(hill_climbing_moves(eq, budget), print_hill_climbing_move)
+
+def print_hill_climbing_move(row, old_col, new_col):
+    print(f"Queen in row [{row}] moved from column [{old_col}] to column [{new_col}]")
+
+def hill_climbing_moves(eq, budget=None):
+    """Generator version of steepest_ascent_hill_climbing: yields the moves, returns the final list"""
     current_state = eq.queens[:]
 
     while True:
@@ -169,21 +185,37 @@ def steepest_ascent_hill_climbing(eq):
         current_h = heuristic(current_state)
         best_h = current_h
         best_state = current_state[:]
+        if instrument.ENABLED:
+            instrument.counters["nodes"] += 1
+
+        # every state is better than the last one, so out of budget just return it
+        if budget is not None:
+            budget.offer(current_state, current_h)
+            if budget.node():
+                return current_state
 
         # Identify all neighbor states
-        for row in range(8):
-            for col in range(8):
+        for row in range(len(current_state)):
+            for col in range(len(current_state)):
                 if col != current_state[row]:
                     neighbor_count += 1
                     neighbor_state = current_state[:]
                     neighbor_state[row] =  col
                     neighbors.append(neighbor_state)
 
+        if instrument.ENABLED:
+            instrument.counters["neighbors"] += neighbor_count
+
         # Evaluate each neighbor state's heuristic, find the best neighbor state, move to that state, repeat the whole thing
         for neighbor in neighbors:
+            if budget is not None and budget.evaluation():
+                break
             neighbor_h = heuristic(neighbor)
             if neighbor_h < best_h:
                 if neighbor_h == 0:
+                    # the final move is yielded but not counted in move_count, as before
+                    row = next(i for i in range(len(current_state)) if current_state[i] != neighbor[i])
+                    yield (row, current_state[row], neighbor[row])
                     current_state = neighbor
                     return current_state
                 else:
@@ -195,12 +227,13 @@ def steepest_ascent_hill_climbing(eq):
 
         if best_h < current_h:
             diff_indices = [i for i in range(len(current_state)) if current_state[i] != best_state[i]]
-            if diff_indices:
-                row = diff_indices[0]
-                print(f"Queen in row [{row}] moved from column [{current_state[row]}] to column [{best_state[row]}]")
+            old_state = current_state
             current_state = best_state
             eq.move_count += 1
             current_h = best_h
+            if diff_indices:
+                row = diff_indices[0]
+                yield (row, old_state[row], best_state[row])
   
 if __name__ == "__main__":
     run_test_cases()
\ No newline at end of file
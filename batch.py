@@ -0,0 +1,272 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import instrument
+from budget import Budget
+from cache import SolutionCache, cached_solve
+from corpus import Corpus, is_corpus
+from rng import run_seed
+from solvers import SOLVERS, solve_batch, warm_up
+from store import Store
+from validate import check_board
+
+# columns of one result record, in output order (error is only set for a bad input line or a failed solve)
+FIELDS = ["index", "solver", "board", "solution", "moves", "conflicts", "valid", "time", "seed", "error"]
+
+def detect_format(path):
+    if path.endswith(".csv"):
+        return "csv"
+    if path != "-" and is_corpus(path):
+        return "corpus"
+    return "jsonl"
+
+def read_boards(lines, fmt="jsonl"):
+    """Yield boards one at a time from JSONL or CSV lines
+
+    JSONL lines are either a list of columns or an object with a "board" key,
+    CSV rows are the columns themselves (a header row is skipped). A line that
+    is not a board yields a ValueError in its place, so it gets an error
+    record and the rest of the stream is still solved.
+    """
+    if fmt == "csv":
+        for number, row in enumerate(csv.reader(lines), 1):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                yield check_board([int(x) for x in row])
+            except ValueError as e:
+                if number == 1:
+                    continue # header row
+                yield ValueError(f"line {number}: {e}")
+        return
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            yield check_board(record["board"] if isinstance(record, dict) else record)
+        except (ValueError, KeyError) as e:
+            yield ValueError(f"line {number}: {e!r}" if isinstance(e, KeyError) else f"line {number}: {e}")
+
+# result cache of this (worker) process, set up by init_worker
+_cache = None
+
+def init_worker(solver, cache_size=0, store_path=None, instrumented=False):
+    """Import the solver and set up the result cache of this process
+
+    With a store path the cache is backed by the persistent store shared by
+    all the workers, so boards solved by any process (or an earlier run) are
+    found with one index lookup. instrumented turns on the solver counters.
+    """
+    global _cache
+    warm_up([solver])
+    instrument.enable(instrumented)
+    if cache_size or store_path:
+        backing = Store(store_path) if store_path else None
+        _cache = SolutionCache(cache_size or 4096, backing)
+
+def close_worker():
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+def solve_chunk(solver, boards, budget=None, seeds=None):
+    """Solve a list of boards, through the cache of this process if there is one
+
+    Bad input lines (ValueError items of read_boards) and boards the solver
+    fails on get an error record of their own.
+    """
+    seeds = seeds or [None] * len(boards)
+    results = []
+    for board, seed in zip(boards, seeds):
+        if isinstance(board, ValueError):
+            results.append({"solver": solver, "board": None, "error": str(board)})
+        elif _cache is None:
+            results.extend(solve_batch(solver, [board], budget, [seed]))
+        else:
+            try:
+                results.append(cached_solve(_cache, solver, board, budget, seed))
+            except Exception as e:
+                results.append({"solver": solver, "board": board, "error": repr(e)})
+    return results
+
+def chunk_seeds(seed, start, count):
+    """Seeds of boards start..start+count from the root seed, None without one
+
+    Each board gets its own stream derived from its index, so the results do
+    not depend on the chunk size or on which worker solved it.
+    """
+    if seed is None:
+        return None
+    return [run_seed(seed, index) for index in range(start, start + count)]
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def solve_stream(boards, solver="backtracking", jobs=1, chunk_size=64, budget=None, cache_size=0, store_path=None,
+                 instrumented=False, seed=None):
+    """Solve boards lazily and yield result dictionaries in input order
+
+    With jobs > 1 chunks of boards are solved in worker processes, but only a
+    few chunks per worker are in flight at once so memory stays flat no matter
+    how many boards come in. With cache_size each process keeps its own cache,
+    with store_path they also share the persistent store. A root seed gives
+    every board a reproducible random stream (see rng.run_seed).
+    """
+    if jobs <= 1:
+        start = 0
+        for chunk in chunked(boards, chunk_size):
+            yield from solve_chunk(solver, chunk, budget, chunk_seeds(seed, start, len(chunk)))
+            start += len(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(solver, cache_size, store_path, instrumented)) as pool:
+        window = deque()
+        start = 0
+        for chunk in chunked(boards, chunk_size):
+            window.append(pool.submit(solve_chunk, solver, chunk, budget, chunk_seeds(seed, start, len(chunk))))
+            start += len(chunk)
+            if len(window) >= jobs * 4:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+# corpora opened by this (worker) process, by path
+_open_corpora = {}
+
+def solve_corpus_range(solver, path, start, stop, budget=None, seed=None):
+    """Solve boards start..stop of a corpus, the worker maps the file itself"""
+    if path not in _open_corpora:
+        _open_corpora[path] = Corpus(path)
+    return solve_chunk(solver, list(_open_corpora[path].boards(start, stop)), budget,
+                       chunk_seeds(seed, start, stop - start))
+
+def solve_corpus(path, solver="backtracking", jobs=1, chunk_size=64, budget=None, cache_size=0, store_path=None,
+                 instrumented=False, seed=None):
+    """Like solve_stream but for a binary corpus: workers get index ranges instead of boards"""
+    with Corpus(path) as corpus:
+        count = len(corpus)
+        if jobs <= 1:
+            yield from solve_stream(corpus.boards(), solver, 1, chunk_size, budget, seed=seed)
+            return
+
+    ranges = ((start, min(start + chunk_size, count)) for start in range(0, count, chunk_size))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(solver, cache_size, store_path, instrumented)) as pool:
+        window = deque()
+        for start, stop in ranges:
+            window.append(pool.submit(solve_corpus_range, solver, path, start, stop, budget, seed))
+            if len(window) >= jobs * 4:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+def format_board(board):
+    return " ".join(str(col) for col in board) if board is not None else ""
+
+def write_results(results, out, fmt="jsonl", counters=False):
+    """Write one record per result and return (count, solved, cache hits, total time, errors)
+
+    With counters the instrumentation counters of every run are written too.
+    """
+    fields = FIELDS + list(instrument.COUNTERS) if counters else FIELDS
+    count = solved = hits = errors = 0
+    total_time = 0.0
+    writer = None
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(fields)
+
+    for index, result in enumerate(results):
+        record = {field: result.get(field) for field in FIELDS}
+        record["index"] = index
+        if counters:
+            # cache hits did not run a solver and have no counters
+            record.update(dict.fromkeys(instrument.COUNTERS), **result.get("counters", {}))
+        if writer is not None:
+            record["board"] = format_board(record["board"])
+            record["solution"] = format_board(record["solution"])
+            writer.writerow([record[field] for field in fields])
+        else:
+            out.write(json.dumps(record) + "\n")
+        count += 1
+        solved += int(bool(result.get("valid")))
+        hits += int(bool(result.get("cached")))
+        errors += int("error" in result)
+        total_time += result.get("time", 0.0)
+    return count, solved, hits, total_time, errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a stream of boards from a file or stdin")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL/CSV file or binary corpus of boards, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    parser.add_argument("--input-format", choices=["jsonl", "csv", "corpus"])
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    parser.add_argument("--solver", default="backtracking", choices=list(SOLVERS))
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (output keeps input order)")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--seconds", type=float, help="time budget per board")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                        help="cache up to SIZE solved boards per process, shared by rotations/reflections")
+    parser.add_argument("--store", help="persistent store checked before solving and shared by all workers")
+    parser.add_argument("--seed", type=int,
+                        help="root seed: every board gets its own reproducible random stream, recorded per result")
+    parser.add_argument("--counters", action="store_true",
+                        help="record nodes/evaluations/... counters of every run next to its time")
+    parser.add_argument("--profile", metavar="FILE", help="cProfile the solver calls into FILE (needs --jobs 1)")
+    args = parser.parse_args(argv)
+    if args.profile and args.jobs > 1:
+        parser.error("--profile only works with --jobs 1")
+
+    input_format = args.input_format or detect_format(args.input)
+    budget = Budget(seconds=args.seconds) if args.seconds is not None else None
+    source = None
+    if input_format != "corpus":
+        source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+
+    profile = instrument.add_hook(instrument.ProfileHook()) if args.profile else None
+    start_time = time.perf_counter()
+    if args.jobs <= 1:
+        init_worker(args.solver, args.cache, args.store, args.counters)
+    try:
+        if input_format == "corpus":
+            results = solve_corpus(args.input, args.solver, args.jobs, args.chunk_size, budget,
+                                   args.cache, args.store, args.counters, args.seed)
+        else:
+            boards = read_boards(source, input_format)
+            results = solve_stream(boards, args.solver, args.jobs, args.chunk_size, budget,
+                                   args.cache, args.store, args.counters, args.seed)
+        count, solved, hits, solve_time, errors = write_results(results, out, args.format, args.counters)
+    finally:
+        close_worker()
+        if source is not None and source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+    wall_time = time.perf_counter() - start_time
+    print(f"Solved {solved}/{count} boards with {args.solver} in {wall_time:.4f} seconds "
+          f"(solver time {solve_time:.4f} seconds)", file=sys.stderr)
+    if errors:
+        print(f"{errors} line(s) could not be solved, see the error field of their records", file=sys.stderr)
+    if profile is not None:
+        profile.dump(args.profile)
+        print(f"Profile written to {args.profile}", file=sys.stderr)
+    if args.cache or args.store:
+        print(f"Cache hit rate: {hits}/{count} ({hits / count * 100 if count else 0:.2f}%)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import heapq
+import math
+from array import array
+
+import instrument
+from BrianKamDingXian import AStarNode, EightQueens, successor_moves
+from moves import run_moves
+from rng import as_random
+
+# Local beam search over the A* successor model: every layer keeps the best
+# `width` of all the successors of the previous layer, so memory stays at
+# O(width * N) where A* keeps every node it generates. States are scored like
+# AStarNode.calculate_heuristic (2 per attacking pair, 3 per empty row), but
+# incrementally: each parent gets column/diagonal counters once and every
+# successor costs O(1). The moves returned are one move per changed row from
+# the input board to the best state found.
+
+def line_counts(queens):
+    """Queen counts of the columns, diagonals and anti-diagonals of a board"""
+    n = len(queens)
+    cols = [0] * n
+    diags = [0] * (2 * n - 1)
+    anti_diags = [0] * (2 * n - 1)
+    for row, col in enumerate(queens):
+        if col != -1:
+            cols[col] += 1
+            diags[row - col + n - 1] += 1
+            anti_diags[row + col] += 1
+    return cols, diags, anti_diags
+
+def beam_search(eq, budget=None, rng=None, width=16, temperature=None):
+    """Local beam search keeping the best width states per layer"""
+    return run_moves(beam_moves(eq, budget, rng, width, temperature), eq.print_move)
+
+def stochastic_beam_search(eq, budget=None, rng=None, width=16, temperature=1.0):
+    """Stochastic beam search: successors are kept at random, weighted by exp(-h / temperature)"""
+    return run_moves(beam_moves(eq, budget, rng, width, temperature), eq.print_move)
+
+def stochastic_beam_moves(eq, budget=None, rng=None, width=16, temperature=1.0):
+    """Generator version of stochastic_beam_search"""
+    return (yield from beam_moves(eq, budget, rng, width, temperature))
+
+def beam_moves(eq, budget=None, rng=None, width=16, temperature=None, max_layers=None):
+    """Generator version of beam_search, with a temperature it is the stochastic variant
+
+    Duplicate states inside a layer are dropped with a set of packed boards.
+    The deterministic variant breaks ties between equal scores at random.
+    """
+    rng = as_random(rng)
+    n = len(eq.queens)
+    max_layers = max_layers if max_layers is not None else 100 + 20 * n
+    start = AStarNode(eq.queens, 0)
+    beam = [(start.h_cost, start.queens)]
+    best_h, best = start.h_cost, start.queens
+    cells = [array("i", [col]).tobytes() for col in range(n)]
+    if budget is not None:
+        budget.offer(best)
+
+    for layer in range(max_layers):
+        if best_h == 0:
+            break
+        base = min(h for h, queens in beam)
+        kept = [] # heap of (priority, tie, h, parent, row, col, key), the worst kept state on top
+        keys = set()
+        stop = False
+        for parent, (h, queens) in enumerate(beam):
+            if instrument.ENABLED:
+                instrument.counters["nodes"] += 1
+            if budget is not None and budget.node():
+                stop = True
+                break
+            cols, diags, anti_diags = line_counts(queens)
+            packed = array("i", queens).tobytes()
+            candidates = 0
+            for row, old, col in successor_moves(queens):
+                candidates += 1
+                child_h = h + 2 * (cols[col] + diags[row - col + n - 1] + anti_diags[row + col])
+                if old == -1:
+                    child_h -= 3
+                else:
+                    # the queen leaves the three lines of its old square (counted in there too)
+                    child_h -= 2 * (cols[old] + diags[row - old + n - 1] + anti_diags[row + old] - 3)
+                if temperature is None:
+                    priority = -child_h
+                else:
+                    # weighted sampling without replacement: the largest u ** (1 / weight) are kept
+                    weight_log = min((child_h - base) / temperature, 700.0)
+                    priority = math.log(rng.random() or 1e-300) * math.exp(weight_log)
+                tie = rng.random()
+                if len(kept) == width and (priority, tie) <= kept[0][:2]:
+                    continue
+                key = packed[:4 * row] + cells[col] + packed[4 * row + 4:]
+                if key in keys:
+                    continue
+                entry = (priority, tie, child_h, parent, row, col, key)
+                if len(kept) < width:
+                    heapq.heappush(kept, entry)
+                else:
+                    keys.discard(heapq.heapreplace(kept, entry)[6])
+                keys.add(key)
+            if instrument.ENABLED:
+                instrument.counters["neighbors"] += candidates
+                instrument.counters["evaluations"] += candidates
+            if budget is not None and budget.evaluation(candidates):
+                stop = True
+                break
+        if not kept:
+            break
+
+        next_beam = []
+        for priority, tie, child_h, parent, row, col, key in kept:
+            queens = beam[parent][1][:]
+            queens[row] = col
+            next_beam.append((child_h, queens))
+            if child_h < best_h:
+                best_h, best = child_h, queens
+                if budget is not None:
+                    budget.offer(best)
+        beam = next_beam
+        if stop:
+            break
+
+    for row, col in enumerate(best):
+        if eq.queens[row] != col:
+            yield eq.move_queen(row, col)
+
+def run_test_cases():
+    # queens[i] = j --> queen at row i, column j.
+    test_cases = [
+        [0, 1, 2, 3, 4, 5, 6, 7],
+        [7, 6, 5, 4, 3, 2, 1, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 2, 4, 6, 0, 2, 4, 6],
+        [1, 3, 1, 3, 1, 3, 1, 3],
+        [0, 2, 2, 5, 5, 7, 7, 1],
+        [4, 4, 2, 2, 0, 0, 6, 6],
+        [0, 3, 1, 4, 2, 5, 3, 6],
+        [1, 1, 1, 1, 2, 2, 2, 2],
+        [0, 1, 0, 1, 0, 1, 0, 1],
+    ]
+
+    wins = 0
+    for i, case in enumerate(test_cases, 1):
+        eq = EightQueens(case)
+        eq.display_board(True)
+        beam_search(eq)
+        eq.display_board(False)
+        if eq.win_or_lose(i):
+            wins += 1
+    print(f"Win: {wins}/{len(test_cases)}")
+
+if __name__ == "__main__":
+    run_test_cases()
@@ -0,0 +1,74 @@
+import time
+
+from validate import count_conflicts
+
+class Budget:
+    """Limits shared by all the solvers: wall-clock seconds, nodes (steps) and evaluations
+
+    Solvers call node() for every expanded node / step and evaluation() for every
+    heuristic or fitness evaluation, both return True once the budget is used up.
+    The best board seen so far is kept with offer() so a solver that runs out
+    of budget can still return its best attempt instead of the input board.
+    """
+
+    def __init__(self, seconds=None, nodes=None, evaluations=None):
+        self.seconds = seconds
+        self.max_nodes = nodes
+        self.max_evaluations = evaluations
+        self.nodes = 0
+        self.evaluations = 0
+        self.exhausted = False
+        self.best_queens = None
+        self.best_conflicts = None
+        self.start()
+
+    def start(self):
+        """(Re)start the clock, called again when the budget is reused for a new board"""
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + self.seconds if self.seconds is not None else None
+        self.nodes = 0
+        self.evaluations = 0
+        self.exhausted = False
+        self.best_queens = None
+        self.best_conflicts = None
+
+    def check(self):
+        """Return True if any of the limits has been reached"""
+        if self.exhausted:
+            return True
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            self.exhausted = True
+        elif self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            self.exhausted = True
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        return self.exhausted
+
+    def node(self, count=1):
+        """Count expanded nodes / steps and check the budget"""
+        self.nodes += count
+        return self.check()
+
+    def evaluation(self, count=1):
+        """Count heuristic / fitness evaluations and check the budget"""
+        self.evaluations += count
+        return self.check()
+
+    def offer(self, queens, conflicts=None):
+        """Remember the board if it has fewer conflicts than the best one so far"""
+        if conflicts is None:
+            conflicts = count_conflicts(queens)
+        if self.best_conflicts is None or conflicts < self.best_conflicts:
+            self.best_queens = list(queens)
+            self.best_conflicts = conflicts
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def summary(self):
+        return {
+            "exhausted": self.exhausted,
+            "nodes": self.nodes,
+            "evaluations": self.evaluations,
+            "elapsed": self.elapsed(),
+        }
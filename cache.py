@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+
+from solvers import STOCHASTIC, solve
+from store import board_key
+from symmetry import canonical
+
+class SolutionCache:
+    """LRU cache of solved boards keyed on the canonical board under the board symmetries
+
+    A board and all its rotations/reflections share one entry: the stored
+    solution is kept in the canonical orientation and mapped back to the
+    orientation of the board that is looked up. Only valid results are stored.
+    An optional backing store (anything with get/put, e.g. store.Store) keeps
+    entries across runs and processes; it is checked on a miss in memory.
+    """
+
+    def __init__(self, maxsize=4096, backing=None):
+        self.maxsize = maxsize
+        self.backing = backing
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, board):
+        """Return (cache key, symmetry, inverse) of a board for one solver"""
+        canonical_board, symmetry, inverse = canonical(board)
+        return board_key(name, canonical_board), symmetry, inverse
+
+    def get(self, name, board):
+        """Cached result for the board (in its own orientation) or None"""
+        if -1 in board:
+            return None # only full boards have the symmetries
+        key, symmetry, inverse = self.key(name, board)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        elif self.backing is not None:
+            entry = self.backing.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        solution = inverse(entry["solution"])
+        # the plan to reach the solution from this board: one move per changed row
+        plan = [(row, board[row], col) for row, col in enumerate(solution) if board[row] != col]
+        return {
+            "solver": name,
+            "board": list(board),
+            "solution": solution,
+            "plan": plan,
+            "moves": entry["moves"],
+            "conflicts": 0,
+            "valid": True,
+            "cached": True,
+        }
+
+    def put(self, name, board, result):
+        if -1 in board or not result.get("valid"):
+            return
+        key, symmetry, inverse = self.key(name, board)
+        # store the solution in the canonical orientation
+        entry = {"solution": symmetry(result["solution"]), "moves": result["moves"]}
+        self._remember(key, entry)
+        if self.backing is not None:
+            self.backing.put(key, entry)
+
+    def _remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        if self.backing is not None:
+            self.backing.close()
+
+def cached_solve(cache, name, board, budget=None, seed=None):
+    """solvers.solve with a cache in front of it
+
+    A seeded run of a stochastic solver skips the cache: its result must
+    follow from its seed, not from whichever board of the same class was
+    solved first.
+    """
+    if seed is not None and name in STOCHASTIC:
+        result = solve(name, board, budget=budget, seed=seed)
+        result["cached"] = False
+        return result
+    start_time = time.perf_counter()
+    result = cache.get(name, board)
+    if result is not None:
+        result["time"] = time.perf_counter() - start_time
+        if seed is not None:
+            result["seed"] = seed
+        return result
+    result = solve(name, board, budget=budget, seed=seed)
+    cache.put(name, board, result)
+    result["cached"] = False
+    return result
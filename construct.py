@@ -0,0 +1,105 @@
+import argparse
+import sys
+import time
+from array import array
+
+# Explicit solutions for any N except 2 and 3 (columns are 1-based here):
+#   N mod 6 not 2 or 3: even columns 2, 4, ..., then odd columns 1, 3, ...
+#   N mod 6 == 2: same, but the odd columns are 3, 1, 7, 9, ..., 5 (swap 1 and 3, 5 goes last)
+#   N mod 6 == 3: even columns 4, 6, ..., 2 (2 goes last), odd columns 5, 7, ..., 1, 3
+# Each row of the board takes the next column of that sequence.
+
+def segments(n):
+    """The 0-based column sequence of the solution as a list of ranges"""
+    if n in (2, 3):
+        raise ValueError(f"there is no solution for N={n}")
+    if n < 1:
+        raise ValueError("N must be at least 1")
+    if n % 6 == 2:
+        return [range(1, n, 2), range(2, 3), range(0, 1), range(6, n, 2), range(4, 5)]
+    if n % 6 == 3:
+        return [range(3, n, 2), range(1, 2), range(4, n, 2), range(0, 1), range(2, 3)]
+    return [range(1, n, 2), range(0, n, 2)]
+
+def columns(n):
+    """Yield the columns of the solution row by row without building a list"""
+    for segment in segments(n):
+        yield from segment
+
+def construct(n, out=None):
+    """Write a valid placement for N queens into out and return it
+
+    out can be a preallocated NumPy array or array.array of length N; by
+    default an array.array is allocated. Each segment is written with one
+    slice assignment so the work is linear with a small constant.
+    """
+    if out is None:
+        out = array("l", bytes(array("l").itemsize * n))
+    if len(out) != n:
+        raise ValueError(f"out has length {len(out)}, expected {n}")
+    numpy_out = hasattr(out, "dtype")
+    if numpy_out:
+        import numpy as np
+
+    row = 0
+    for segment in segments(n):
+        if numpy_out:
+            out[row:row + len(segment)] = np.arange(segment.start, segment.stop, segment.step)
+        else:
+            out[row:row + len(segment)] = array(out.typecode, segment)
+        row += len(segment)
+    return out
+
+def write_solution(n, out, fmt="text", chunk=65536):
+    """Stream the solution to a file object without holding it in memory
+
+    text: one line of space separated columns, binary: little-endian uint32 per row
+    """
+    for segment in segments(n):
+        for start in range(0, len(segment), chunk):
+            part = segment[start:start + chunk]
+            if fmt == "binary":
+                values = array("I", part)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                out.write(values.tobytes())
+            else:
+                out.write(" ".join(map(str, part)) + " ")
+    if fmt != "binary":
+        out.write("\n")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Constructive O(N) N-Queens solution")
+    parser.add_argument("n", type=int)
+    parser.add_argument("-o", "--output", help="stream the solution to a file")
+    parser.add_argument("--format", choices=["text", "binary"], default="text")
+    parser.add_argument("--check", action="store_true", help="validate with the batch validator")
+    args = parser.parse_args(argv)
+    if args.n in (2, 3) or args.n < 1:
+        parser.error(f"there is no solution for N={args.n}")
+
+    start_time = time.perf_counter()
+    if args.output:
+        with open(args.output, "wb" if args.format == "binary" else "w") as out:
+            write_solution(args.n, out, args.format)
+    else:
+        solution = construct(args.n)
+    time_used = time.perf_counter() - start_time
+    print(f"N = {args.n}: constructed in {time_used:.4f} seconds", file=sys.stderr)
+
+    if args.check:
+        import numpy as np
+        from validate import validate_batch
+        if args.output and args.format == "binary":
+            board = np.fromfile(args.output, dtype="<u4")
+        elif args.output:
+            board = np.loadtxt(args.output, dtype=np.int64, ndmin=1)
+        else:
+            board = np.frombuffer(solution, dtype=np.dtype(solution.typecode))
+        valid, conflicts = validate_batch(board.reshape(1, -1))
+        print(f"Valid: {bool(valid[0])} (conflicts: {int(conflicts[0])})", file=sys.stderr)
+    elif not args.output and args.n <= 64:
+        print(list(solution))
+
+if __name__ == "__main__":
+    main()
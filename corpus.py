@@ -0,0 +1,182 @@
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+# Binary board corpus (.nqc), little-endian:
+#   header (32 bytes): magic "NQCB", version u16, width u16, N u32, count u64, 12 bytes padding
+#   rows: count boards of N columns each, width bytes per column
+#   (1 byte per column for N <= 256, 2 bytes above that)
+MAGIC = b"NQCB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ12x")
+
+def column_width(n):
+    return 1 if n <= 256 else 2
+
+class Corpus:
+    """Read-only, memory-mapped view of a board corpus
+
+    Boards are returned as slices of the mapped file without copying, so
+    several processes reading the same corpus share it through the page cache.
+    Release any views taken from array() before calling close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.n, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a board corpus")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported corpus version {version}")
+        if len(self.map) < HEADER.size + self.count * self.n * self.width:
+            raise ValueError(f"{path} is truncated")
+        data = memoryview(self.map)[HEADER.size:HEADER.size + self.count * self.n * self.width]
+        self.rows = data.cast("B" if self.width == 1 else "H")
+        self.swap = self.width == 2 and sys.byteorder != "little"
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """Board number index as a memoryview slice of the file (no copy)"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("board index out of range")
+        return self.rows[index * self.n:(index + 1) * self.n]
+
+    def board(self, index):
+        """Board number index as a list, for the solvers that need one"""
+        row = self[index]
+        if self.swap:
+            row = array("H", row)
+            row.byteswap()
+        return row.tolist()
+
+    def boards(self, start=0, stop=None):
+        """Yield boards start..stop as lists"""
+        stop = self.count if stop is None else min(stop, self.count)
+        for index in range(start, stop):
+            yield self.board(index)
+
+    def array(self):
+        """NumPy (count, N) view of every board, backed directly by the mapped file"""
+        import numpy as np
+        return np.frombuffer(self.map, dtype=np.uint8 if self.width == 1 else "<u2",
+                             count=self.count * self.n, offset=HEADER.size).reshape(self.count, self.n)
+
+    def close(self):
+        self.rows.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class CorpusWriter:
+    """Append boards of size N to a new corpus file, the count is written on close"""
+
+    def __init__(self, path, n):
+        self.n = n
+        self.width = column_width(n)
+        self.count = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.width, n, 0))
+
+    def write(self, board):
+        if len(board) != self.n:
+            raise ValueError(f"board has {len(board)} rows, corpus is for N={self.n}")
+        if min(board) < 0 or max(board) >= self.n:
+            raise ValueError(f"board columns must be between 0 and {self.n - 1}: {list(board)}")
+        if self.width == 1:
+            self.file.write(bytes(board))
+        else:
+            row = array("H", board)
+            if sys.byteorder != "little":
+                row.byteswap()
+            self.file.write(row.tobytes())
+        self.count += 1
+
+    def write_many(self, boards):
+        for board in boards:
+            self.write(board)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.width, self.n, self.count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def write_corpus(path, boards, n=None):
+    """Write a list of lists (or any iterable of boards) to a corpus file"""
+    boards = iter(boards)
+    first = next(boards, None)
+    if first is None:
+        if n is None:
+            raise ValueError("N is needed to write an empty corpus")
+        CorpusWriter(path, n).close()
+        return 0
+    with CorpusWriter(path, n or len(first)) as writer:
+        writer.write(first)
+        writer.write_many(boards)
+        return writer.count
+
+def is_corpus(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Binary board corpus tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert", help="convert JSONL/CSV boards to a corpus")
+    p.add_argument("input", help="JSONL/CSV file, - for stdin")
+    p.add_argument("output")
+    p.add_argument("-n", type=int, help="board size (default: length of the first board)")
+    p = sub.add_parser("dump", help="print a corpus as JSONL")
+    p.add_argument("corpus")
+    p = sub.add_parser("info", help="print the header of a corpus")
+    p.add_argument("corpus")
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        from batch import detect_format, read_boards
+
+        def boards(source):
+            # a corpus has no room for error records, so a bad line stops the conversion
+            for board in read_boards(source, detect_format(args.input)):
+                if isinstance(board, ValueError):
+                    parser.error(str(board))
+                yield board
+
+        source = sys.stdin if args.input == "-" else open(args.input, newline="")
+        with source:
+            count = write_corpus(args.output, boards(source), args.n)
+        print(f"Wrote {count} boards to {args.output}", file=sys.stderr)
+    elif args.command == "dump":
+        with Corpus(args.corpus) as corpus:
+            for board in corpus.boards():
+                sys.stdout.write(json.dumps(board) + "\n")
+    else:
+        with Corpus(args.corpus) as corpus:
+            print(f"N: {corpus.n}")
+            print(f"Boards: {corpus.count}")
+            print(f"Bytes per column: {corpus.width}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import sys
+import time
+
+# N-Queens as an exact cover problem for Knuth's Algorithm X with Dancing
+# Links. Every allowed cell (row, col) is an option covering four items: its
+# row and its column (primary, each covered exactly once) and its two
+# diagonals (secondary, covered at most once). Blocked cells are simply left
+# out and reserved queens are chosen before the search. The nodes live in
+# flat integer lists (left, right, up, down, item, cell) indexed by node
+# number; nodes 0..items are the item headers, 0 being the root.
+
+class DancingLinks:
+    """Exact cover matrix of an N x N board with blocked cells and reserved queens
+
+    blocked is an iterable of (row, col) cells no queen may use, board an
+    optional list of columns with -1 for a free row whose queens must stay.
+    """
+
+    def __init__(self, n, blocked=(), board=None):
+        self.n = n
+        primary = 2 * n
+        items = primary + 2 * (2 * n - 1)
+        # headers: the primary items are linked to the root, the secondary ones only to themselves
+        self.left = [i - 1 for i in range(primary + 1)] + list(range(primary + 1, items + 1))
+        self.right = [i + 1 for i in range(primary + 1)] + list(range(primary + 1, items + 1))
+        self.left[0] = primary
+        self.right[primary] = 0
+        self.up = list(range(items + 1))
+        self.down = list(range(items + 1))
+        self.item = list(range(items + 1))
+        self.cell = [-1] * (items + 1)
+        self.size = [0] * (items + 1)
+        self.possible = True
+        self.reserved = list(board) if board is not None else None
+
+        blocked = set(blocked)
+        first = {} # cell -> its first node
+        for row in range(n):
+            for col in range(n):
+                if (row, col) not in blocked:
+                    first[row * n + col] = self._add_option(row, col)
+
+        if board is not None:
+            for row, col in enumerate(board):
+                if col == -1:
+                    continue
+                node = first.get(row * n + col) if 0 <= col < n else None
+                if node is None or not self._reserve(node):
+                    self.possible = False # blocked, off the board or attacked by another reserved queen
+                    break
+
+    def _add_option(self, row, col):
+        n = self.n
+        items = (1 + row, 1 + n + col, 1 + 2 * n + row - col + n - 1, 1 + 2 * n + 2 * n - 1 + row + col)
+        start = len(self.item)
+        for k, item in enumerate(items):
+            node = start + k
+            self.left.append(start + (k - 1) % 4)
+            self.right.append(start + (k + 1) % 4)
+            self.up.append(self.up[item])
+            self.down.append(item)
+            self.down[self.up[item]] = node
+            self.up[item] = node
+            self.item.append(item)
+            self.cell.append(row * n + col)
+            self.size[item] += 1
+        return start
+
+    def _reserve(self, node):
+        """Choose an option before the search, False if it clashes with an option chosen before"""
+        nodes = [node, node + 1, node + 2, node + 3]
+        # covering an item unlinks the other nodes of all the options that use it
+        if any(self.down[self.up[j]] != j for j in nodes):
+            return False
+        for j in nodes:
+            self._cover(self.item[j])
+        return True
+
+    def _cover(self, c):
+        left, right, up, down, item, size = self.left, self.right, self.up, self.down, self.item, self.size
+        left[right[c]] = left[c]
+        right[left[c]] = right[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[item[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, c):
+        left, right, up, down, item, size = self.left, self.right, self.up, self.down, self.item, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[item[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        left[right[c]] = c
+        right[left[c]] = c
+
+    def _choose(self):
+        """The primary item with the fewest options left, 0 if all are covered"""
+        right, size = self.right, self.size
+        c = right[0]
+        best, best_size = c, size[c] if c else 0
+        while c:
+            if size[c] < best_size:
+                best, best_size = c, size[c]
+                if best_size <= 1:
+                    break
+            c = right[c]
+        return best
+
+    def _search(self, chosen):
+        c = self._choose()
+        if c == 0:
+            yield chosen
+            return
+        self._cover(c)
+        try:
+            r = self.down[c]
+            while r != c:
+                chosen.append(r)
+                j = self.right[r]
+                while j != r:
+                    self._cover(self.item[j])
+                    j = self.right[j]
+                try:
+                    yield from self._search(chosen)
+                finally:
+                    # also runs when the consumer stops early, so the links are always restored
+                    j = self.left[r]
+                    while j != r:
+                        self._uncover(self.item[j])
+                        j = self.left[j]
+                    chosen.pop()
+                r = self.down[r]
+        finally:
+            self._uncover(c)
+
+    def solutions(self):
+        """Yield every solution as a list of columns, reserved queens included"""
+        if not self.possible:
+            return
+        n = self.n
+        for chosen in self._search([]):
+            queens = [-1] * n
+            for node in chosen:
+                queens[self.cell[node] // n] = self.cell[node] % n
+            yield self._with_reserved(queens)
+
+    def _with_reserved(self, queens):
+        """Fill in the reserved queens, which are not part of the search"""
+        if self.reserved is None:
+            return queens
+        for row, col in enumerate(self.reserved):
+            if col != -1:
+                queens[row] = col
+        return queens
+
+    def first(self):
+        """The first solution or None"""
+        return next(self.solutions(), None)
+
+    def count(self):
+        """Number of solutions, without building them"""
+        if not self.possible:
+            return 0
+        return self._count()
+
+    def _count(self):
+        c = self._choose()
+        if c == 0:
+            return 1
+        total = 0
+        right, left, down, item = self.right, self.left, self.down, self.item
+        self._cover(c)
+        r = down[c]
+        while r != c:
+            j = right[r]
+            while j != r:
+                self._cover(item[j])
+                j = right[j]
+            total += self._count()
+            j = left[r]
+            while j != r:
+                self._uncover(item[j])
+                j = left[j]
+            r = down[r]
+        self._uncover(c)
+        return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exact cover (Dancing Links) N-Queens with blocked cells")
+    parser.add_argument("n", type=int)
+    parser.add_argument("--block", nargs=2, type=int, action="append", default=[], metavar=("ROW", "COL"),
+                        help="a cell no queen may use, can be repeated")
+    parser.add_argument("--board", help="file with a board of columns, -1 for a free row, the given queens stay")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--count", action="store_true", help="count the solutions")
+    mode.add_argument("--all", action="store_true", help="print every solution")
+    args = parser.parse_args(argv)
+
+    board = None
+    if args.board:
+        with open(args.board) as f:
+            board = [int(x) for x in f.read().split()]
+        if len(board) != args.n:
+            parser.error(f"the board has {len(board)} rows, expected {args.n}")
+
+    start_time = time.perf_counter()
+    links = DancingLinks(args.n, [tuple(cell) for cell in args.block], board)
+    if args.count:
+        print(links.count())
+    elif args.all:
+        for queens in links.solutions():
+            print(" ".join(map(str, queens)))
+    else:
+        queens = links.first()
+        print(" ".join(map(str, queens)) if queens is not None else "No solution")
+    print(f"N = {args.n}, {len(args.block)} cells blocked: {time.perf_counter() - start_time:.4f} seconds",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
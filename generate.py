@@ -0,0 +1,210 @@
+import argparse
+import json
+import random
+import sys
+
+from validate import count_conflicts
+
+# Board families, every generator yields an endless stream of N-column boards
+# from a seeded random.Random so the same seed always gives the same corpus.
+
+def attack_counts(queens):
+    """Column, diagonal and anti-diagonal occupancy counters of a board"""
+    n = len(queens)
+    cols = [0] * n
+    diags = [0] * (2 * n - 1)
+    anti_diags = [0] * (2 * n - 1)
+    for row, col in enumerate(queens):
+        cols[col] += 1
+        diags[row - col + n - 1] += 1
+        anti_diags[row + col] += 1
+    return cols, diags, anti_diags
+
+def random_solution(n, rng):
+    """A random valid board found with min-conflicts from a random permutation"""
+    if n in (2, 3):
+        raise ValueError(f"there is no solution for N={n}")
+    while True:
+        queens = list(range(n))
+        rng.shuffle(queens)
+        cols, diags, anti_diags = attack_counts(queens)
+        for _ in range(50 * n + 100):
+            conflicted = [row for row, col in enumerate(queens)
+                          if cols[col] + diags[row - col + n - 1] + anti_diags[row + col] > 3]
+            if not conflicted:
+                return queens
+            row = rng.choice(conflicted)
+            old = queens[row]
+            cols[old] -= 1
+            diags[row - old + n - 1] -= 1
+            anti_diags[row + old] -= 1
+            scores = [cols[c] + diags[row - c + n - 1] + anti_diags[row + c] for c in range(n)]
+            best = min(scores)
+            col = rng.choice([c for c in range(n) if scores[c] == best])
+            queens[row] = col
+            cols[col] += 1
+            diags[row - col + n - 1] += 1
+            anti_diags[row + col] += 1
+
+def uniform_boards(n, rng):
+    """Every column chosen independently (duplicates allowed)"""
+    while True:
+        yield [rng.randrange(n) for _ in range(n)]
+
+def permutation_boards(n, rng):
+    """Random permutations: no column conflicts, only diagonal ones"""
+    while True:
+        queens = list(range(n))
+        rng.shuffle(queens)
+        yield queens
+
+def near_solution_boards(n, rng, distance=2):
+    """Valid boards with exactly distance queens moved to another column"""
+    distance = min(distance, n)
+    while True:
+        queens = random_solution(n, rng)
+        for row in rng.sample(range(n), distance):
+            queens[row] = rng.choice([c for c in range(n) if c != queens[row]])
+        yield queens
+
+def conflict_boards(n, rng, conflicts=4):
+    """Boards with exactly the given number of attacking pairs
+
+    Starts from a random board and moves single queens, keeping a move when it
+    brings the conflict count closer to the target.
+    """
+    max_pairs = n * (n - 1) // 2
+    if not 0 <= conflicts <= max_pairs:
+        raise ValueError(f"conflicts must be between 0 and {max_pairs}")
+    while True:
+        queens = random_solution(n, rng) if conflicts == 0 else [rng.randrange(n) for _ in range(n)]
+        current = count_conflicts(queens)
+        for _ in range(200 * n):
+            if current == conflicts:
+                yield queens
+                break
+            row = rng.randrange(n)
+            old = queens[row]
+            queens[row] = rng.randrange(n)
+            new = count_conflicts(queens)
+            if abs(new - conflicts) <= abs(current - conflicts):
+                current = new
+            else:
+                queens[row] = old
+
+def is_local_minimum(queens):
+    """True if no single queen move lowers the conflict count (a hill-climbing trap)"""
+    n = len(queens)
+    cols, diags, anti_diags = attack_counts(queens)
+    for row, old in enumerate(queens):
+        old_attacks = cols[old] + diags[row - old + n - 1] + anti_diags[row + old] - 3
+        for col in range(n):
+            if col == old:
+                continue
+            # col != old, so the moving queen is not part of these counters
+            new_attacks = cols[col] + diags[row - col + n - 1] + anti_diags[row + col]
+            if new_attacks < old_attacks:
+                return False
+    return True
+
+def plateau_boards(n, rng):
+    """Adversarial for hill climbing: unsolved boards where every single move is no better"""
+    if n < 2:
+        raise ValueError(f"there is no unsolved board for N={n}")
+    while True:
+        queens = [rng.randrange(n) for _ in range(n)]
+        # greedy descent until stuck, then keep it if it is not a solution
+        while not is_local_minimum(queens):
+            cols, diags, anti_diags = attack_counts(queens)
+            best = (0, None, None)
+            for row, old in enumerate(queens):
+                old_attacks = cols[old] + diags[row - old + n - 1] + anti_diags[row + old] - 3
+                for col in range(n):
+                    if col != old:
+                        gain = old_attacks - (cols[col] + diags[row - col + n - 1] + anti_diags[row + col])
+                        if gain > best[0]:
+                            best = (gain, row, col)
+            if best[1] is None:
+                break
+            queens[best[1]] = best[2]
+        if count_conflicts(queens) > 0:
+            yield queens
+
+def astar_expansions(queens, limit=None):
+    """Number of nodes A* expands on a board, at most limit"""
+    from budget import Budget
+    from solvers import solve
+
+    budget = Budget(nodes=limit)
+    solve("astar", queens, budget=budget)
+    return budget.nodes
+
+def astar_hard_boards(n, rng, candidates=8, limit=5000):
+    """Adversarial for A*: the random board on which A* expands the most nodes
+
+    Each of candidates uniform boards is solved with A* (capped at limit
+    expanded nodes) and the one that needed the most expansions is kept. The
+    number of attacking pairs is a poor proxy for this: it does not change
+    the expansions on average.
+    """
+    boards = uniform_boards(n, rng)
+    while True:
+        yield max((next(boards) for _ in range(candidates)), key=lambda queens: astar_expansions(queens, limit))
+
+FAMILIES = {
+    "uniform": uniform_boards,
+    "permutation": permutation_boards,
+    "near": near_solution_boards,
+    "conflicts": conflict_boards,
+    "plateau": plateau_boards,
+    "astar-hard": astar_hard_boards,
+}
+
+def generate(family, n=8, count=1000, seed=0, **options):
+    """Yield count boards of a family, the same seed gives the same boards"""
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown family '{family}', choose from: {', '.join(FAMILIES)}")
+    rng = random.Random(f"{family}-{n}-{seed}")
+    boards = FAMILIES[family](n, rng, **options)
+    for _ in range(count):
+        yield next(boards)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded board corpora for benchmarking")
+    parser.add_argument("family", choices=list(FAMILIES))
+    parser.add_argument("-n", type=int, default=8, help="board size")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--distance", type=int, default=2, help="queens moved away from a solution (near)")
+    parser.add_argument("--conflicts", type=int, default=4, help="attacking pairs (conflicts)")
+    parser.add_argument("--format", choices=["jsonl", "csv", "corpus"], default="jsonl")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout (not for corpus)")
+    args = parser.parse_args(argv)
+
+    options = {}
+    if args.family == "near":
+        options["distance"] = args.distance
+    elif args.family == "conflicts":
+        options["conflicts"] = args.conflicts
+    boards = generate(args.family, args.n, args.count, args.seed, **options)
+
+    if args.format == "corpus":
+        if args.output == "-":
+            parser.error("a corpus needs an output file (-o)")
+        from corpus import write_corpus
+        write_corpus(args.output, boards, args.n)
+        return
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for board in boards:
+            if args.format == "csv":
+                out.write(",".join(str(col) for col in board) + "\n")
+            else:
+                out.write(json.dumps(board) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
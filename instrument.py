@@ -0,0 +1,121 @@
+import time
+from contextlib import ExitStack, contextmanager
+
+# Counters shared by all the solvers. The hot loops guard every update with
+#   if instrument.ENABLED: instrument.counters["nodes"] += 1
+# so with instrumentation off an event costs one global lookup and nothing else.
+
+ENABLED = False
+
+COUNTERS = (
+    "nodes",        # expanded nodes / search steps
+    "evaluations",  # heuristic, fitness and safety checks
+    "neighbors",    # successor boards generated
+    "backtracks",   # placements undone by the tree searches
+    "sa_accepted",  # simulated annealing proposals taken
+    "sa_rejected",  # ... and turned down
+    "generations",  # genetic algorithm generations
+)
+
+counters = dict.fromkeys(COUNTERS, 0)
+
+# Memory timeline: with SAMPLE_EVERY = K a solver that supports it (A*) calls
+# sample() every K expansions with the size of its main structures. It is
+# independent of ENABLED; off it costs the solver one global lookup per
+# expansion. Samples are (step, seconds since the start, structure, entries,
+# estimated bytes).
+SAMPLE_EVERY = 0
+
+timeline = []
+_start_time = time.perf_counter()
+
+# context manager factories called with the solver name around every solver call
+hooks = []
+
+def enable(enabled=True):
+    global ENABLED
+    ENABLED = enabled
+
+def reset():
+    global _start_time
+    for name in COUNTERS:
+        counters[name] = 0
+    timeline.clear()
+    _start_time = time.perf_counter()
+
+def sample_every(steps):
+    """Record a memory sample every steps expansions, 0 to stop sampling"""
+    global SAMPLE_EVERY
+    SAMPLE_EVERY = steps
+
+def sample(step, **structures):
+    """Record the size of some structures, each given as name=(entries, estimated bytes)"""
+    elapsed = time.perf_counter() - _start_time
+    for name, (entries, size) in structures.items():
+        timeline.append((step, elapsed, name, entries, size))
+
+def peak(samples=None):
+    """Return (step, total bytes, {structure: bytes}) of the sample with the most bytes in total"""
+    totals = {}
+    for step, elapsed, name, entries, size in timeline if samples is None else samples:
+        totals.setdefault(step, {})[name] = size
+    if not totals:
+        return None
+    step = max(totals, key=lambda step: sum(totals[step].values()))
+    return step, sum(totals[step].values()), totals[step]
+
+def snapshot():
+    """Copy of the counters of the last (or current) solver call"""
+    return dict(counters)
+
+def add_hook(hook):
+    hooks.append(hook)
+    return hook
+
+def remove_hook(hook):
+    hooks.remove(hook)
+
+@contextmanager
+def run(name):
+    """Wrap one solver call: reset the counters and enter every hook"""
+    reset()
+    with ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook(name))
+        yield counters
+
+class ProfileHook:
+    """cProfile every solver call, the stats are accumulated per solver"""
+
+    def __init__(self):
+        self.profiles = {}
+
+    @contextmanager
+    def __call__(self, name):
+        import cProfile
+
+        profile = self.profiles.get(name)
+        if profile is None:
+            profile = self.profiles[name] = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def stats(self, name, sort="cumulative"):
+        import pstats
+
+        return pstats.Stats(self.profiles[name]).sort_stats(sort)
+
+    def dump(self, path):
+        """Write the stats of all solvers to one file (pstats / snakeviz format)"""
+        import pstats
+
+        if not self.profiles:
+            return
+        profiles = list(self.profiles.values())
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
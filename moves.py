@@ -0,0 +1,79 @@
+import time
+
+# Every solver is also available as a generator of moves ("<solver>_moves" in
+# its module, see solvers.MOVES). A move is a plain tuple
+#   (row, old column, new column)
+# with -1 for an empty row. The generators change eq silently and return
+# what the blocking solver function returns; the consumer decides the pace
+# and can stop the search at any time by closing the generator. Consumers
+# that want the conflicts after every move wrap the generator in
+# with_conflicts, which keeps column/diagonal counters (O(1) per move), so
+# the solvers themselves never pay for them.
+
+def run_moves(moves, show=None):
+    """Run a move generator to the end and return its return value
+
+    show(row, old, new) is called for every move, the blocking solver
+    functions pass their print function so they keep their output.
+    """
+    while True:
+        try:
+            row, old, new = next(moves)
+        except StopIteration as stop:
+            return stop.value
+        if show is not None:
+            show(row, old, new)
+
+def with_conflicts(moves, board):
+    """Yield the moves of a generator as (row, old, new, conflicts); returns its return value
+
+    board is the board the moves start from. The conflicts (attacking pairs,
+    as validate.count_conflicts) are those of that board with every move so
+    far applied; what leaves a row is taken from the board, not the move.
+    """
+    n = len(board)
+    board = list(board)
+    cols = [0] * n
+    diags = [0] * (2 * n - 1)
+    anti_diags = [0] * (2 * n - 1)
+    conflicts = 0
+
+    def update(row, col, step):
+        nonlocal conflicts
+        if step < 0:
+            cols[col] -= 1
+            diags[row - col + n - 1] -= 1
+            anti_diags[row + col] -= 1
+        conflicts += step * (cols[col] + diags[row - col + n - 1] + anti_diags[row + col])
+        if step > 0:
+            cols[col] += 1
+            diags[row - col + n - 1] += 1
+            anti_diags[row + col] += 1
+
+    for row, col in enumerate(board):
+        if col != -1:
+            update(row, col, 1)
+    try:
+        while True:
+            try:
+                row, old, new = next(moves)
+            except StopIteration as stop:
+                return stop.value
+            if board[row] != -1:
+                update(row, board[row], -1)
+            if new != -1:
+                update(row, new, 1)
+            board[row] = new
+            yield row, old, new, conflicts
+    finally:
+        moves.close() # closing this generator stops the solver too
+
+def throttle(moves, interval):
+    """Yield the moves of a generator at most one every interval seconds"""
+    next_time = time.perf_counter()
+    for move in moves:
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_time = max(next_time, time.perf_counter()) + interval
+        yield move
@@ -0,0 +1,223 @@
+import argparse
+import json
+import struct
+import sys
+from array import array
+
+# Binary move trace (.nqt), little-endian:
+#   header (48 bytes): magic "NQMT", version u16, width u16, N u32, count u64,
+#                      solver name (24 bytes, utf-8, zero padded), 4 bytes padding
+#   initial board: N signed columns (-1 for an empty row)
+#   records: count moves of three signed values (row, from column, to column)
+# Every value is width bytes: 1 for N <= 127, 2 for N <= 32767, 4 above that.
+# The count is written on close; a trace that was never closed has count 0
+# and the reader takes every whole record in the file instead.
+MAGIC = b"NQMT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ24s4x")
+TYPECODES = {1: "b", 2: "h", 4: "i"}
+
+def value_width(n):
+    return 1 if n <= 127 else 2 if n <= 32767 else 4
+
+class TraceWriter:
+    """Write the moves of one solver run to a trace file through an in-memory buffer"""
+
+    def __init__(self, path, board, solver="", buffer_moves=65536):
+        self.n = len(board)
+        self.width = value_width(self.n)
+        self.solver = solver
+        self.count = 0
+        self.buffer = array(TYPECODES[self.width])
+        self.buffer_size = 3 * buffer_moves
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.width, self.n, 0, solver.encode()[:24]))
+        self._write(array(TYPECODES[self.width], board))
+
+    def _write(self, values):
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        self.file.write(values.tobytes())
+
+    def write(self, row, old, new):
+        self.buffer.extend((row, old, new))
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def record(self, moves):
+        """Pass the moves of a move generator through, writing each one; returns its return value"""
+        while True:
+            try:
+                move = next(moves)
+            except StopIteration as stop:
+                return stop.value
+            self.write(*move)
+            yield move
+
+    def flush(self):
+        self._write(self.buffer)
+        del self.buffer[:]
+
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.width, self.n, self.count, self.solver.encode()[:24]))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Trace:
+    """A trace file read into memory: the initial board and the moves as a flat array"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a move trace")
+        magic, version, self.width, self.n, count, solver = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a move trace")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported trace version {version}")
+        self.solver = solver.rstrip(b"\0").decode()
+        values = array(TYPECODES[self.width])
+        start = HEADER.size
+        end = start + self.n * self.width
+        records = (len(data) - end) // (3 * self.width)
+        if count > records:
+            raise ValueError(f"{path} is truncated")
+        self.count = count or records
+        values.frombytes(data[start:end + 3 * self.width * self.count])
+        if sys.byteorder != "little":
+            values.byteswap()
+        self.initial = values[:self.n].tolist()
+        self.records = values[self.n:]
+
+    def __len__(self):
+        return self.count
+
+    def moves(self, start=0, stop=None):
+        """Yield the moves start..stop as (row, from, to)"""
+        stop = self.count if stop is None else min(stop, self.count)
+        records = self.records
+        for i in range(3 * start, 3 * stop, 3):
+            yield records[i], records[i + 1], records[i + 2]
+
+    def boards(self, every=1):
+        """Yield (step, board) for step 0 (the initial board) and every every-th step, the board is reused"""
+        board = list(self.initial)
+        yield 0, board
+        for step, (row, old, new) in enumerate(self.moves(), 1):
+            board[row] = new
+            if step % every == 0 or step == self.count:
+                yield step, board
+
+    def board_at(self, step):
+        """The board after step moves (0 is the initial board)"""
+        board = list(self.initial)
+        for row, old, new in self.moves(0, step):
+            board[row] = new
+        return board
+
+    def stats(self):
+        """Moves per row, attacking pairs along the run (column/diagonal counters, O(1) per move)"""
+        n = self.n
+        cols = [0] * n
+        diags = [0] * (2 * n - 1)
+        anti_diags = [0] * (2 * n - 1)
+        conflicts = 0
+
+        def update(row, col, step):
+            nonlocal conflicts
+            if step < 0:
+                cols[col] -= 1
+                diags[row - col + n - 1] -= 1
+                anti_diags[row + col] -= 1
+            conflicts += step * (cols[col] + diags[row - col + n - 1] + anti_diags[row + col])
+            if step > 0:
+                cols[col] += 1
+                diags[row - col + n - 1] += 1
+                anti_diags[row + col] += 1
+
+        for row, col in enumerate(self.initial):
+            if col != -1:
+                update(row, col, 1)
+        initial_conflicts = best_conflicts = conflicts
+        best_step = 0
+        row_moves = [0] * n
+        board = list(self.initial)
+        for step, (row, old, new) in enumerate(self.moves(), 1):
+            row_moves[row] += 1
+            # the board, not the record, says what leaves the row (dfs records its own search board)
+            if board[row] != -1:
+                update(row, board[row], -1)
+            if new != -1:
+                update(row, new, 1)
+            board[row] = new
+            if conflicts < best_conflicts:
+                best_conflicts, best_step = conflicts, step
+        return {
+            "solver": self.solver,
+            "n": n,
+            "moves": self.count,
+            "initial_conflicts": initial_conflicts,
+            "final_conflicts": conflicts,
+            "best_conflicts": best_conflicts,
+            "best_step": best_step,
+            "rows_moved": sum(1 for moves in row_moves if moves),
+            "most_moved_row": max(range(n), key=row_moves.__getitem__) if n else None,
+            "row_moves": row_moves,
+        }
+
+def render(board, step, count):
+    """Print a board with EightQueens.display_board"""
+    from main import EightQueens
+
+    print(f"\nStep {step} of {count}", end="")
+    EightQueens(board).display_board(isInitial=step == 0)
+
+def record(solver, board, path, seed=None):
+    """Run a solver on a board and write its moves to a trace file, return the result dictionary"""
+    from solvers import solve
+
+    return solve(solver, board, seed=seed, trace=path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record, replay and summarize binary move traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("record", help="run a solver on a board and trace its moves")
+    p.add_argument("solver")
+    p.add_argument("board", help="board as space or comma separated columns")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--seed", type=int)
+    p = sub.add_parser("replay", help="print the boards of a trace")
+    p.add_argument("trace")
+    p.add_argument("--step", type=int, action="append", help="only this step (can be repeated)")
+    p.add_argument("--every", type=int, default=1, help="print every every-th step")
+    p = sub.add_parser("stats", help="print the statistics of a trace as JSON")
+    p.add_argument("trace")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        board = [int(x) for x in args.board.replace(",", " ").split()]
+        result = record(args.solver, board, args.output, args.seed)
+        print(f"{result['moves']} moves, valid={result['valid']}, trace written to {args.output}", file=sys.stderr)
+    elif args.command == "replay":
+        trace = Trace(args.trace)
+        if args.step:
+            for step in args.step:
+                render(trace.board_at(step), min(step, len(trace)), len(trace))
+        else:
+            for step, board in trace.boards(args.every):
+                render(board, step, len(trace))
+    else:
+        print(json.dumps(Trace(args.trace).stats()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import sys
+
+from solvers import SOLVERS, solve
+
+# One entry point for all the solvers. solvers.SOLVERS is the registry and
+# only the module of the selected solver is imported. A single board needs
+# nothing else; reading files, worker processes, JSON/CSV output and NumPy
+# are only imported on the paths that use them.
+
+def print_result(result):
+    print(f"Solver: {result['solver']}")
+    print(f"Board: {' '.join(map(str, result['board']))}")
+    print(f"Solution: {' '.join(map(str, result['solution']))}")
+    print(f"Valid: {result['valid']} (conflicts: {result['conflicts']})")
+    print(f"Moves: {result['moves']}")
+    print(f"Time: {result['time']:.4f} seconds")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve N-Queens boards with any of the solvers")
+    parser.add_argument("board", nargs="*", type=int, help="columns of one board, -1 for an empty row")
+    parser.add_argument("-a", "--algorithm", default="backtracking", choices=list(SOLVERS))
+    parser.add_argument("-n", type=int, help="solve a random N x N board (see --seed) instead of a given one")
+    parser.add_argument("-i", "--input", help="JSONL/CSV file or binary corpus of boards, - for stdin")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes for --input")
+    parser.add_argument("-f", "--format", choices=["text", "jsonl", "csv"], default="text",
+                        help="output format (--input writes jsonl unless csv is asked for)")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    parser.add_argument("--seed", type=int, help="seed of the random board and of the stochastic solvers")
+    parser.add_argument("--seconds", type=float, help="time budget per board")
+    parser.add_argument("--show", action="store_true", help="print the moves of the solver (one board only)")
+    parser.add_argument("--list", action="store_true", help="list the solvers and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (module, function) in SOLVERS.items():
+            print(f"{name:<20} {module}.{function}")
+        return
+    if sum(bool(x) for x in (args.board, args.n, args.input)) != 1:
+        parser.error("give one board, -n N or --input FILE")
+
+    budget = None
+    if args.seconds is not None:
+        from budget import Budget
+        budget = Budget(seconds=args.seconds)
+
+    if args.input:
+        batch_args = [args.input, "--solver", args.algorithm, "--jobs", str(args.jobs), "-o", args.output,
+                      "--format", "csv" if args.format == "csv" else "jsonl"]
+        if args.seed is not None:
+            batch_args += ["--seed", str(args.seed)]
+        if args.seconds is not None:
+            batch_args += ["--seconds", str(args.seconds)]
+        from batch import main as batch_main
+        batch_main(batch_args)
+        return
+
+    if args.n:
+        from generate import generate
+        board = next(generate("uniform", args.n, 1, args.seed or 0))
+    else:
+        board = args.board
+    result = solve(args.algorithm, board, quiet=not args.show, budget=budget, seed=args.seed)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        if args.format == "text":
+            if out is sys.stdout:
+                print_result(result)
+            else:
+                out.write(" ".join(map(str, result["solution"])) + "\n")
+        else:
+            from batch import write_results
+            write_results([result], out, args.format)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if not result["valid"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
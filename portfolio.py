@@ -0,0 +1,98 @@
+import multiprocessing
+import queue
+import sys
+import time
+
+from budget import Budget
+from rng import run_seed
+from solvers import SOLVERS, solve
+
+# how a finished result is ranked when metric is not "first"
+METRICS = {
+    "moves": lambda result: (result["moves"], result["time"]),
+    "time": lambda result: result["time"],
+    "conflicts": lambda result: (result["conflicts"], result["moves"]),
+}
+
+def _worker(name, board, results, budget, seed=None):
+    """Run one solver in a worker process and send the result back"""
+    try:
+        results.put(solve(name, board, budget=budget, seed=seed))
+    except Exception as e:
+        results.put({"solver": name, "error": repr(e), "valid": False})
+
+def portfolio_solve(board, solvers=None, metric="first", deadline=None, seed=None):
+    """Race several solvers on the same board in worker processes
+
+    metric="first" returns the first valid result and cancels the rest,
+    otherwise results are collected until the deadline (seconds) or until
+    every solver finished and the best valid one by the metric is returned.
+    Returns None if no solver found a valid placement in time. With a root
+    seed every solver gets its own reproducible random stream.
+    """
+    solvers = list(solvers or SOLVERS)
+    if metric != "first" and metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}', choose from: first, {', '.join(METRICS)}")
+
+    # the solvers also get the deadline so they give up on their own
+    budget = Budget(seconds=deadline) if deadline is not None else None
+    results = multiprocessing.Queue()
+    workers = []
+    for i, name in enumerate(solvers):
+        run = run_seed(seed, i) if seed is not None else None
+        p = multiprocessing.Process(target=_worker, args=(name, list(board), results, budget, run), daemon=True)
+        p.start()
+        workers.append(p)
+
+    start_time = time.perf_counter()
+    end_time = start_time + deadline if deadline is not None else None
+    finished = []
+    best = None
+    try:
+        while len(finished) < len(workers):
+            timeout = None
+            if end_time is not None:
+                timeout = end_time - time.perf_counter()
+                if timeout <= 0:
+                    break
+            try:
+                result = results.get(timeout=timeout)
+            except queue.Empty:
+                break
+            finished.append(result)
+
+            if not result.get("valid"):
+                continue
+            if metric == "first":
+                best = result
+                break
+            if best is None or METRICS[metric](result) < METRICS[metric](best):
+                best = result
+    finally:
+        # cancel the solvers that are still running
+        for p in workers:
+            if p.is_alive():
+                p.terminate()
+        for p in workers:
+            p.join()
+        results.close()
+
+    if best is not None:
+        best = dict(best)
+        best["wall_time"] = time.perf_counter() - start_time
+        best["finished"] = [r["solver"] for r in finished]
+    return best
+
+if __name__ == "__main__":
+    # usage: python portfolio.py 0 0 0 0 0 0 0 0 [metric]
+    args = sys.argv[1:]
+    board = [int(x) for x in args if x.lstrip("-").isdigit()] or [0] * 8
+    metric = next((x for x in args if not x.lstrip("-").isdigit()), "first")
+    result = portfolio_solve(board, metric=metric, deadline=10)
+    if result is None:
+        print("No solver found a valid placement in time")
+    else:
+        print(f"Winner: {result['solver']}")
+        print(f"Solution: {result['solution']}")
+        print(f"Move Count: {result['moves']}")
+        print(f"Time Used: {result['time']:.4f} seconds (wall {result['wall_time']:.4f} seconds)")
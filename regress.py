@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import sys
+import tracemalloc
+
+import instrument
+from generate import generate
+from rng import run_seed
+from solvers import SOLVERS, solve, warm_up
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baseline.json")
+
+# the boards of run_test_cases, followed by seeded random boards
+TEST_CASES = [
+    [0, 1, 2, 3, 4, 5, 6, 7],
+    [7, 6, 5, 4, 3, 2, 1, 0],
+    [0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 2, 4, 6, 0, 2, 4, 6],
+    [1, 3, 1, 3, 1, 3, 1, 3],
+    [0, 2, 2, 5, 5, 7, 7, 1],
+    [4, 4, 2, 2, 0, 0, 6, 6],
+    [0, 3, 1, 4, 2, 5, 3, 6],
+    [1, 1, 1, 1, 2, 2, 2, 2],
+    [0, 1, 0, 1, 0, 1, 0, 1],
+]
+
+def workload(boards=10, seed=0):
+    return TEST_CASES + list(generate("uniform", 8, boards, seed))
+
+def corpus_workload(path):
+    """(spec, boards) of a binary corpus, the spec names the file and a digest of its boards"""
+    from corpus import Corpus
+    with Corpus(path) as corpus:
+        boards = list(corpus.boards())
+        digest = hashlib.blake2b(corpus.rows.tobytes(), digest_size=8).hexdigest()
+    return {"corpus": os.path.basename(path), "n": len(boards[0]) if boards else 0, "boards": len(boards),
+            "digest": digest}, boards
+
+def run_workload(name, boards, repeats=7):
+    """Measure one solver on the workload
+
+    Every repeat solves all the boards and gives one time sample (the sum of
+    the solver times). Counters and tracemalloc peaks come from one extra pass.
+    Every board has its own seed so the random solvers do the same work in
+    every pass.
+    """
+    seeds = [run_seed(0, i) for i in range(len(boards))]
+    enabled = instrument.ENABLED
+    instrument.enable()
+    try:
+        times = []
+        for _ in range(repeats):
+            total = 0.0
+            for board, seed in zip(boards, seeds):
+                total += solve(name, board, seed=seed)["time"]
+            times.append(total)
+
+        measured = {"time": times, "evaluations": 0, "nodes": 0, "peak_kb": 0.0, "valid": 0}
+        for board, seed in zip(boards, seeds):
+            tracemalloc.start()
+            result = solve(name, board, seed=seed)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            measured["evaluations"] += result["counters"]["evaluations"]
+            measured["nodes"] += result["counters"]["nodes"]
+            measured["peak_kb"] += peak / 1024
+            measured["valid"] += int(result["valid"])
+        return measured
+    finally:
+        instrument.enable(enabled)
+
+def mann_whitney(baseline, current):
+    """p-value of a one-sided Mann-Whitney U test that current tends to be larger than baseline
+
+    Normal approximation with tie correction and continuity correction.
+    """
+    n1, n2 = len(baseline), len(current)
+    values = sorted([(x, 0) for x in baseline] + [(x, 1) for x in current])
+    n = n1 + n2
+    # average ranks over ties
+    rank_sum = 0.0
+    ties = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[j + 1][0] == values[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(group for _, group in values[i:j + 1])
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    u = rank_sum - n2 * (n2 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+def compare(baseline, current, time_threshold=0.25, memory_threshold=0.2, evaluation_threshold=0.05, alpha=0.01):
+    """Compare the measurements of one solver, return a list of (metric, old, new, change, p, regressed)
+
+    Time regresses when the median is more than time_threshold slower and the
+    Mann-Whitney test says the slowdown is not noise. Evaluations, nodes and
+    memory are deterministic for the seeded workload and only need the threshold.
+    """
+    rows = []
+    old, new = median(baseline["time"]), median(current["time"])
+    p = mann_whitney(baseline["time"], current["time"])
+    change = new / old - 1 if old else 0.0
+    rows.append(("time", old, new, change, p, change > time_threshold and p < alpha))
+
+    for metric, threshold in (("evaluations", evaluation_threshold), ("nodes", evaluation_threshold),
+                              ("peak_kb", memory_threshold)):
+        old, new = baseline[metric], current[metric]
+        change = new / old - 1 if old else (1.0 if new else 0.0)
+        rows.append((metric, old, new, change, None, change > threshold))
+
+    old, new = baseline["valid"], current["valid"]
+    rows.append(("valid", old, new, new / old - 1 if old else 0.0, None, new < old))
+    return rows
+
+def format_value(metric, value):
+    if metric == "time":
+        return f"{value:.4f}s"
+    if metric == "peak_kb":
+        return f"{value:.1f}KB"
+    return str(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seeded benchmark of every solver compared to a stored baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--corpus", help="binary corpus (.nqc) to measure instead of the built-in workload, "
+                                         "use its own --baseline")
+    parser.add_argument("--update", action="store_true", help="write the measurements as the new baseline")
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--repeats", type=int, default=7, help="time samples per solver")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="allowed median slowdown (0.25 = 25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.2)
+    parser.add_argument("--evaluation-threshold", type=float, default=0.05)
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level of the time test")
+    parser.add_argument("--store", help="also keep the measurements of every solver in this persistent store")
+    args = parser.parse_args(argv)
+
+    stored = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    if args.corpus:
+        spec, boards = corpus_workload(args.corpus)
+    else:
+        spec = {"boards": 10, "seed": 0}
+        boards = workload(**spec)
+    if stored is not None and not args.update and stored["workload"] != spec:
+        parser.error("the baseline was made with a different workload, run again with --update")
+
+    warm_up(args.solvers)
+    results = {}
+    for name in args.solvers:
+        print(f"Measuring {name}...", file=sys.stderr)
+        results[name] = run_workload(name, boards, args.repeats)
+
+    if args.store:
+        from store import Store, benchmark_key
+        with Store(args.store) as store:
+            for name, result in results.items():
+                store.put(benchmark_key(f"regress:{name}"), {"workload": spec, "python": platform.python_version(),
+                                                               "machine": platform.machine(), **result})
+
+    if args.update:
+        # keep the other solvers of the baseline only if they were measured on the same workload
+        solvers = dict(stored["solvers"]) if stored is not None and stored["workload"] == spec else {}
+        solvers.update(results)
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"workload": spec, "python": platform.python_version(),
+                       "machine": platform.machine(), "solvers": solvers}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if stored is None:
+        parser.error(f"no baseline at {args.baseline}, create one with --update")
+
+    regressions = []
+    print(f"{'solver':<20} {'metric':<12} {'baseline':>12} {'current':>12} {'change':>8} {'p':>7}")
+    for name, current in results.items():
+        if name not in stored["solvers"]:
+            print(f"{name:<20} no baseline, run with --update")
+            continue
+        for metric, old, new, change, p, regressed in compare(
+                stored["solvers"][name], current, args.time_threshold, args.memory_threshold,
+                args.evaluation_threshold, args.alpha):
+            flag = "  REGRESSION" if regressed else ""
+            p_text = f"{p:.4f}" if p is not None else "-"
+            print(f"{name:<20} {metric:<12} {format_value(metric, old):>12} {format_value(metric, new):>12} "
+                  f"{change * 100:>+7.1f}% {p_text:>7}{flag}")
+            if regressed:
+                regressions.append((name, metric))
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): " + ", ".join(f"{name} {metric}" for name, metric in regressions))
+        sys.exit(1)
+    print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
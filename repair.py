@@ -0,0 +1,153 @@
+import argparse
+import random
+import sys
+import time
+
+from construct import construct
+
+def repair(queens, seed=0, samples=32, max_steps=None):
+    """Fix a large board with as few moves as possible
+
+    Queens that are not attacked stay where they are. Only conflicted rows
+    are moved, each to the least attacked of a few candidate columns (its
+    column in the constructive solution, some empty columns and some random
+    ones), using column/diagonal counters so every move costs O(samples).
+    Returns (solution, moves) where moves is the list of (row, from, to).
+    """
+    n = len(queens)
+    rng = random.Random(seed)
+    queens = list(queens)
+    max_steps = max_steps if max_steps is not None else 50 * n + 1000
+    seed_cols = construct(n) if n not in (2, 3) else None
+
+    # queen count and sum of queen rows per column/diagonal: a line holding
+    # one other queen tells which row a move attacks
+    cols, col_rows = [0] * n, [0] * n
+    diags, diag_rows = [0] * (2 * n - 1), [0] * (2 * n - 1)
+    anti_diags, anti_rows = [0] * (2 * n - 1), [0] * (2 * n - 1)
+
+    # empty columns, with their position in the list for O(1) removal
+    free = []
+    free_pos = {}
+
+    def update(row, col, step):
+        d, a = row - col + n - 1, row + col
+        cols[col] += step
+        diags[d] += step
+        anti_diags[a] += step
+        col_rows[col] += step * row
+        diag_rows[d] += step * row
+        anti_rows[a] += step * row
+        if step < 0 and cols[col] == 0:
+            free_pos[col] = len(free)
+            free.append(col)
+        elif step > 0 and cols[col] == 1 and col in free_pos:
+            i = free_pos.pop(col)
+            last = free.pop()
+            if last != col:
+                free[i] = last
+                free_pos[last] = i
+
+    for row, col in enumerate(queens):
+        if 0 <= col < n:
+            update(row, col, 1)
+    free.extend(col for col in range(n) if cols[col] == 0)
+    free_pos.update((col, i) for i, col in enumerate(free))
+
+    def attacks(row, col):
+        """Queens attacking (row, col), not counting a queen of this row at col"""
+        own = 3 if queens[row] == col else 0
+        return cols[col] + diags[row - col + n - 1] + anti_diags[row + col] - own
+
+    def conflicted_rows():
+        return [row for row, col in enumerate(queens) if not 0 <= col < n or attacks(row, col) > 0]
+
+    moves = []
+    pending = conflicted_rows()
+    is_pending = bytearray(n)
+    for row in pending:
+        is_pending[row] = 1
+    steps = 0
+    while steps < max_steps:
+        if not pending:
+            # a line with several queens only reports one of them, so look again
+            pending = conflicted_rows()
+            if not pending:
+                break
+            for row in pending:
+                is_pending[row] = 1
+        i = rng.randrange(len(pending))
+        row = pending[i]
+        old = queens[row]
+        placed = 0 <= old < n
+        current = attacks(row, old) if placed else n
+        if current == 0:
+            pending[i] = pending[-1]
+            pending.pop()
+            is_pending[row] = 0
+            continue
+        steps += 1
+
+        candidates = [rng.randrange(n) for _ in range(samples)]
+        if free:
+            candidates += [free[rng.randrange(len(free))] for _ in range(samples)]
+        if seed_cols is not None:
+            candidates.append(seed_cols[row])
+        best = []
+        best_score = current
+        for col in candidates:
+            if col == old:
+                continue
+            score = cols[col] + diags[row - col + n - 1] + anti_diags[row + col]
+            if score < best_score:
+                best, best_score = [col], score
+            elif score == best_score and col not in best:
+                best.append(col)
+        if not best:
+            continue
+        col = best[rng.randrange(len(best))]
+
+        if placed:
+            update(row, old, -1)
+        update(row, col, 1)
+        queens[row] = col
+        moves.append((row, old, col))
+        # queens alone on a line before this move are now attacked
+        for count, rows in ((cols[col], col_rows[col]),
+                            (diags[row - col + n - 1], diag_rows[row - col + n - 1]),
+                            (anti_diags[row + col], anti_rows[row + col])):
+            if count == 2 and not is_pending[rows - row]:
+                is_pending[rows - row] = 1
+                pending.append(rows - row)
+
+    return queens, moves
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repair a large board with min-conflicts moves")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="board as space separated columns (text), - for stdin")
+    parser.add_argument("-o", "--output", help="write the repaired board here (text)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="validate with the batch validator")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    with source:
+        board = [int(x) for x in source.read().split()]
+
+    start_time = time.perf_counter()
+    solution, moves = repair(board, args.seed)
+    time_used = time.perf_counter() - start_time
+    print(f"N = {len(board)}: {len(moves)} moves, {len({row for row, _, _ in moves})} rows changed, "
+          f"{time_used:.4f} seconds", file=sys.stderr)
+
+    if args.check:
+        from validate import validate_batch
+        valid, conflicts = validate_batch([solution])
+        print(f"Valid: {bool(valid[0])} (conflicts: {int(conflicts[0])})", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as out:
+            out.write(" ".join(map(str, solution)) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import random
+
+# Random number streams for the stochastic solvers (simulated annealing and
+# the genetic algorithm). They take rng=None (the global random module, as
+# before), a random.Random, or a NumPy Generator. Reproducible runs get one
+# seed each from run_seed(root, key...), so parallel workers draw independent
+# streams and any single run can be replayed from its recorded seed.
+
+class NumpyRandom:
+    """random.Random-like view of a NumPy Generator, with the methods the solvers use"""
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def random(self):
+        return float(self.generator.random())
+
+    def randint(self, a, b):
+        return int(self.generator.integers(a, b + 1))
+
+    def randrange(self, start, stop=None):
+        if stop is None:
+            start, stop = 0, start
+        return int(self.generator.integers(start, stop))
+
+    def choice(self, seq):
+        return seq[int(self.generator.integers(len(seq)))]
+
+    def sample(self, population, k):
+        return [population[int(i)] for i in self.generator.choice(len(population), k, replace=False)]
+
+    def shuffle(self, x):
+        self.generator.shuffle(x)
+
+def as_random(rng=None):
+    """The random.Random-like object to draw from for rng"""
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    if hasattr(rng, "bit_generator"):
+        return NumpyRandom(rng)
+    return rng
+
+def run_seed(root, *key):
+    """Seed of one run derived from a root seed and the run's key (e.g. board index)
+
+    Same as the seed of the matching child of SeedSequence(root).spawn(), but
+    computed directly so a worker only needs the index of its board.
+    """
+    from numpy.random import SeedSequence
+
+    state = SeedSequence(root, spawn_key=key).generate_state(2)
+    return int(state[0]) << 32 | int(state[1])
@@ -0,0 +1,313 @@
+import argparse
+import csv
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from multiprocessing.connection import wait
+
+import instrument
+from budget import Budget
+from generate import FAMILIES, generate
+from rng import run_seed
+from solvers import SOLVERS, solve, warm_up
+
+# one CSV row per (solver, N, seed) run
+FIELDS = ["solver", "n", "seed", "status", "valid", "time", "peak_kb", "moves", "conflicts", "nodes", "evaluations",
+          "run_seed"]
+DEFAULT_SIZES = [4, 5, 6, 8, 10, 12, 16, 20, 24, 32]
+
+# one CSV row per structure and memory sample of a run (see instrument.sample)
+TIMELINE_FIELDS = ["solver", "n", "seed", "step", "elapsed", "structure", "entries", "bytes"]
+
+# a run that ignores its budget gets killed this long after its timeout
+GRACE = 5.0
+
+def _run(name, board, seconds, memory_mb, conn, seed=None, sample_every=0):
+    """One run in its own process, capped at memory_mb of address space"""
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    instrument.enable()
+    instrument.sample_every(sample_every)
+    result = None
+    # peak of the memory allocated during the run, as regress.py measures it (the
+    # max RSS of a forked process mostly shows the parent it was forked from)
+    tracemalloc.start()
+    try:
+        result = solve(name, board, budget=Budget(seconds=seconds), seed=seed)
+        peak = tracemalloc.get_traced_memory()[1]
+    except MemoryError:
+        pass # report it below, once the traceback and the search state are freed
+    except Exception as e:
+        result = {"status": "error", "error": repr(e)}
+    if result is None:
+        conn.send({"status": "memory"})
+        return
+    if "status" in result:
+        conn.send(result)
+        return
+    result["status"] = "timeout" if result["exhausted"] else "ok"
+    result["peak_kb"] = peak / 1024
+    result["nodes"] = result["counters"]["nodes"]
+    result["evaluations"] = result["counters"]["evaluations"]
+    conn.send(result)
+
+def run_tasks(tasks, seconds, memory_mb=None, jobs=1, root_seed=0, sample_every=0):
+    """Run (solver, n, seed, board) tasks, at most jobs at a time, and yield one row per task
+
+    Rows come out in the order the runs finish. The random stream of a run
+    depends only on the root seed, N and the seed number, so every solver gets
+    the same stream for the same board and any run can be replayed alone.
+    With sample_every the rows of the solvers that record a memory timeline
+    carry it under "timeline".
+    """
+    pending = deque(tasks)
+    running = {} # connection -> (task, process, kill time)
+    while pending or running:
+        while pending and len(running) < jobs:
+            task = pending.popleft()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            seed = run_seed(root_seed, task[1], task[2])
+            p = multiprocessing.Process(target=_run, args=(task[0], task[3], seconds, memory_mb, sender, seed,
+                                                                 sample_every), daemon=True)
+            p.start()
+            sender.close()
+            running[receiver] = (task + (seed,), p, time.perf_counter() + seconds + GRACE)
+
+        timeout = max(0.0, min(kill for _, _, kill in running.values()) - time.perf_counter())
+        for conn in wait(list(running), timeout=timeout):
+            task, p, kill = running.pop(conn)
+            try:
+                result = conn.recv()
+            except EOFError:
+                # killed by the kernel or crashed before it could report
+                result = {"status": "crashed"}
+            conn.close()
+            p.join()
+            yield _row(task, result)
+
+        now = time.perf_counter()
+        for conn, (task, p, kill) in list(running.items()):
+            if now >= kill:
+                p.kill()
+                p.join()
+                conn.close()
+                del running[conn]
+                yield _row(task, {"status": "timeout"})
+
+def _row(task, result):
+    name, n, seed, board, run = task
+    row = {field: result.get(field) for field in FIELDS}
+    row.update(solver=name, n=n, seed=seed, run_seed=run)
+    if result.get("timeline"):
+        row["timeline"] = result["timeline"]
+    if row["valid"] is None:
+        row["valid"] = False
+    return row
+
+def read_rows(path):
+    """Rows of an earlier (possibly interrupted) run, [] if there is none"""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            row["n"] = int(row["n"])
+            row["seed"] = int(row["seed"])
+            row["valid"] = row["valid"] == "True"
+            for field in ("time", "peak_kb", "nodes", "evaluations"):
+                row[field] = float(row[field]) if row[field] else None
+            rows.append(row)
+        return rows
+
+def slope(points):
+    """Least squares slope of log(y) over log(x): the growth exponent k of y ~ x^k"""
+    points = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y and y > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    if var == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+def fit(rows, min_success=0.5):
+    """Growth exponents of time, nodes and memory per solver, fitted on the sizes it mostly solves
+
+    Returns {solver: {"time", "nodes", "memory", "max_n", "success"}}, max_n is
+    the largest N solved in at least min_success of the runs.
+    """
+    runs = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        runs[row["solver"]][row["n"]].append(row)
+
+    exponents = {}
+    for name, sizes in runs.items():
+        practical = {n: size_rows for n, size_rows in sizes.items()
+                     if sum(row["valid"] for row in size_rows) / len(size_rows) >= min_success}
+
+        def points(field):
+            result = []
+            for n, size_rows in sorted(practical.items()):
+                values = [row[field] for row in size_rows if row["status"] == "ok" and row[field] is not None]
+                if values:
+                    result.append((n, median(values)))
+            return result
+
+        total = sum(len(size_rows) for size_rows in sizes.values())
+        exponents[name] = {
+            "time": slope(points("time")),
+            "nodes": slope(points("nodes")),
+            "memory": slope(points("peak_kb")),
+            "max_n": max(practical, default=None),
+            "success": sum(row["valid"] for size_rows in sizes.values() for row in size_rows) / total,
+        }
+    return exponents
+
+def plot(rows, path):
+    """Log-log plot of the median time per N for every solver"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    times = defaultdict(lambda: defaultdict(list))
+    for row in rows:
+        if row["status"] == "ok" and row["time"]:
+            times[row["solver"]][row["n"]].append(row["time"])
+    fig, ax = plt.subplots()
+    for name, sizes in sorted(times.items()):
+        ns = sorted(sizes)
+        ax.plot(ns, [median(sizes[n]) for n in ns], marker="o", label=name)
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.set_xlabel("N")
+    ax.set_ylabel("median time (seconds)")
+    ax.legend()
+    fig.savefig(path)
+
+def format_exponent(value):
+    return f"{value:.2f}" if value is not None else "-"
+
+def corpus_boards(paths, count):
+    """{N: the first count boards} of each corpus, a corpus holds one N"""
+    from corpus import Corpus
+    boards = {}
+    for path in paths:
+        with Corpus(path) as corpus:
+            if corpus.n in boards:
+                raise ValueError(f"{path}: there is already a corpus for N={corpus.n}")
+            boards[corpus.n] = list(corpus.boards(0, count))
+    return boards
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep board sizes and seeds for each solver and fit growth exponents")
+    parser.add_argument("-o", "--output", default="scaling.csv", help="CSV of all runs, appended to when resuming")
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--seeds", type=int, default=3, help="boards per size")
+    parser.add_argument("--family", default="uniform", choices=list(FAMILIES))
+    parser.add_argument("--corpus", nargs="+", metavar="FILE",
+                        help="binary corpora (.nqc) to take the boards from instead of --family and --sizes, "
+                             "the first --seeds boards of each")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--memory", type=int, default=1024, help="address space cap per run in MB, 0 for none")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="runs at the same time")
+    parser.add_argument("--root-seed", type=int, default=0, help="root of the random streams of all runs")
+    parser.add_argument("--timeline", metavar="FILE",
+                        help="CSV of the memory samples of the solvers that record them (A*), appended to")
+    parser.add_argument("--sample-every", type=int, default=100, help="expansions between memory samples")
+    parser.add_argument("--store", help="also keep the fitted exponents of every solver in this persistent store")
+    parser.add_argument("--plot", metavar="FILE", help="save a log-log time plot (needs matplotlib)")
+    args = parser.parse_args(argv)
+
+    rows = read_rows(args.output)
+    done = {(row["solver"], row["n"], row["seed"]) for row in rows}
+    if args.corpus:
+        try:
+            boards = corpus_boards(args.corpus, args.seeds)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        boards = {n: [next(generate(args.family, n, 1, seed)) for seed in range(args.seeds)] for n in args.sizes}
+    # small boards first, so an interrupted sweep still covers the practical sizes
+    tasks = [(name, n, seed, board)
+             for n in sorted(boards) for name in args.solvers for seed, board in enumerate(boards[n])
+             if (name, n, seed) not in done]
+    if done:
+        print(f"Resuming: {len(done)} runs done, {len(tasks)} to go", file=sys.stderr)
+
+    warm_up(args.solvers)
+    new_file = not rows
+    fields = FIELDS
+    if not new_file:
+        with open(args.output, newline="") as f:
+            fields = next(csv.reader(f)) # keep the columns of a file from an older version
+    peaks = []
+    with ExitStack() as stack:
+        out = stack.enter_context(open(args.output, "a", newline=""))
+        writer = csv.DictWriter(out, fields, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+        timeline_writer = None
+        if args.timeline:
+            new_timeline = not os.path.exists(args.timeline)
+            timeline_out = stack.enter_context(open(args.timeline, "a", newline=""))
+            timeline_writer = csv.writer(timeline_out)
+            if new_timeline:
+                timeline_writer.writerow(TIMELINE_FIELDS)
+        sample_every = args.sample_every if args.timeline else 0
+
+        for row in run_tasks(tasks, args.timeout, args.memory, args.jobs, args.root_seed, sample_every):
+            timeline = row.pop("timeline", None)
+            writer.writerow(row)
+            out.flush() # every finished run survives an interruption
+            if timeline:
+                timeline_writer.writerows((row["solver"], row["n"], row["seed"]) + sample for sample in timeline)
+                timeline_out.flush()
+                peaks.append((row["solver"], row["n"], row["seed"]) + instrument.peak(timeline))
+            rows.append(row)
+            print(f"{row['solver']:<20} N={row['n']:<4} seed={row['seed']:<3} {row['status']:<8} "
+                  f"valid={row['valid']}", file=sys.stderr)
+
+    fits = fit(rows)
+    if args.store:
+        from store import Store, benchmark_key
+        source = {"corpus": [os.path.basename(path) for path in args.corpus]} if args.corpus else {"family": args.family}
+        with Store(args.store) as store:
+            for name, fitted in fits.items():
+                store.put(benchmark_key(f"scaling:{name}"), {**source, **fitted})
+
+    print(f"\n{'solver':<20} {'time':>6} {'nodes':>6} {'memory':>7} {'max N':>6} {'solved':>7}")
+    for name, fitted in sorted(fits.items()):
+        print(f"{name:<20} {format_exponent(fitted['time']):>6} {format_exponent(fitted['nodes']):>6} "
+              f"{format_exponent(fitted['memory']):>7} {fitted['max_n'] or '-':>6} {fitted['success'] * 100:>6.1f}%")
+    print("(growth exponents k of value ~ N^k, fitted on the sizes solved in at least half of the runs)")
+
+    if peaks:
+        print(f"\n{'solver':<20} {'N':>4} {'seed':>4} {'step':>7} {'peak':>10}  largest structure")
+        for name, n, seed, step, total, structures in peaks:
+            largest = max(structures, key=structures.get)
+            print(f"{name:<20} {n:>4} {seed:>4} {step:>7} {total / 1024:>8.1f}KB  "
+                  f"{largest} ({structures[largest] / total * 100:.0f}%)")
+        print("(estimated memory of the sampled structures at the largest sample of each run)")
+
+    if args.plot:
+        try:
+            plot(rows, args.plot)
+        except ImportError:
+            print("matplotlib is not installed, no plot written", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
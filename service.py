@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from budget import Budget
+from solvers import SOLVERS, solve_batch, warm_up
+from validate import check_board
+
+# Protocol: one JSON object per line in both directions.
+#   request:  {"id": 1, "board": [0, 0, 0, 0, 0, 0, 0, 0], "solver": "backtracking", "seconds": 1.0}
+#   response: the result dictionary of solvers.solve plus the request id
+#   {"op": "metrics"} returns the queue depth and latency metrics instead
+
+class SolveService:
+    """Long-lived solving service: asyncio in front, warm worker processes behind
+
+    Requests that arrive close together are grouped by solver and budget into
+    batches of up to batch_size boards (waiting at most batch_wait seconds for
+    more to arrive) and each batch is solved by one worker in a single call.
+    """
+
+    def __init__(self, workers=2, batch_size=32, batch_wait=0.005):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.pool = None
+        self.pending = None
+        self.in_flight = 0
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0 # requests whose solve failed
+        self.rejected = 0 # requests refused before they were queued
+        self.latencies = deque(maxlen=1000) # seconds, most recent requests only
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_up)
+        self.pending = asyncio.Queue()
+        self.slots = asyncio.Semaphore(self.workers * 2) # batches queued at the pool
+        self.batcher = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle_client, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        self.pool.shutdown(cancel_futures=True)
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+        return {
+            "queue_depth": self.pending.qsize(),
+            "batches_in_flight": self.in_flight,
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "average_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+    async def submit(self, request):
+        """Queue one request and wait for its result dictionary"""
+        solver = request.get("solver", "backtracking")
+        try:
+            if solver not in SOLVERS:
+                raise ValueError(f"Unknown solver '{solver}'")
+            board = check_board(request.get("board"))
+        except ValueError:
+            # a bad request never joins a batch, so it cannot fail the requests of other clients
+            self.rejected += 1
+            raise
+        limits = (request.get("seconds"), request.get("nodes"), request.get("evaluations"))
+        future = asyncio.get_running_loop().create_future()
+        await self.pending.put(((solver, limits), board, future, time.perf_counter()))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # wait for one request, then give the others a moment to arrive
+            items = [await self.pending.get()]
+            end_time = loop.time() + self.batch_wait
+            while len(items) < self.batch_size:
+                timeout = end_time - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups = {}
+            for item in items:
+                groups.setdefault(item[0], []).append(item)
+            for key, group in groups.items():
+                await self.slots.acquire()
+                asyncio.create_task(self._run_batch(key, group))
+
+    async def _run_batch(self, key, group):
+        solver, limits = key
+        budget = Budget(*limits) if any(x is not None for x in limits) else None
+        boards = [item[1] for item in group]
+        self.in_flight += 1
+        self.batches += 1
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.pool, solve_batch, solver, boards, budget)
+        except Exception as e:
+            # the worker itself failed (solve_batch catches the errors of single boards)
+            self.requests += len(group)
+            self.errors += len(group)
+            for item in group:
+                if not item[2].done():
+                    item[2].set_exception(e)
+            return
+        finally:
+            self.in_flight -= 1
+            self.slots.release()
+
+        now = time.perf_counter()
+        for item, result in zip(group, results):
+            self.requests += 1
+            if "error" in result:
+                self.errors += 1
+            else:
+                self.latencies.append(now - item[3])
+            if not item[2].done():
+                item[2].set_result(result)
+
+    async def _handle_client(self, reader, writer):
+        write_lock = asyncio.Lock()
+
+        async def respond(message):
+            async with write_lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+
+        async def answer(request):
+            try:
+                result = dict(await self.submit(request))
+            except Exception as e:
+                result = {"error": repr(e)}
+            result["id"] = request.get("id")
+            await respond(result)
+
+        # results are streamed back as soon as they are ready, not in request order
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await respond({"error": f"invalid JSON: {e}"})
+                    continue
+                if request.get("op") == "metrics":
+                    await respond(self.metrics())
+                    continue
+                task = asyncio.create_task(answer(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+async def client_solve(boards, solver="backtracking", host="127.0.0.1", port=8765, **limits):
+    """Send boards to a running service and return the results in the same order"""
+    reader, writer = await asyncio.open_connection(host, port)
+    for i, board in enumerate(boards):
+        request = {"id": i, "board": list(board), "solver": solver}
+        request.update({k: v for k, v in limits.items() if v is not None})
+        writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+
+    results = [None] * len(boards)
+    for _ in boards:
+        result = json.loads(await reader.readline())
+        results[result["id"]] = result
+    writer.close()
+    await writer.wait_closed()
+    return results
+
+async def client_metrics(host="127.0.0.1", port=8765):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "metrics"}\n')
+    await writer.drain()
+    metrics = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return metrics
+
+async def serve(host, port, workers, batch_size, batch_wait):
+    service = SolveService(workers, batch_size, batch_wait)
+    server = await service.start(host, port)
+    print(f"Serving on {host}:{port} with {workers} workers")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local N-Queens solving service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="start the service")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--batch-size", type=int, default=32)
+    p.add_argument("--batch-wait", type=float, default=0.005, help="seconds to wait for a batch to fill")
+    p = sub.add_parser("solve", help="send one board to a running service")
+    p.add_argument("board", type=int, nargs="+")
+    p.add_argument("--solver", default="backtracking", choices=list(SOLVERS))
+    p.add_argument("--seconds", type=float)
+    sub.add_parser("metrics", help="print the metrics of a running service")
+    for p in sub.choices.values():
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.workers, args.batch_size, args.batch_wait))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "solve":
+        result = asyncio.run(client_solve([args.board], args.solver, args.host, args.port, seconds=args.seconds))[0]
+        print(json.dumps(result))
+    else:
+        print(json.dumps(asyncio.run(client_metrics(args.host, args.port)), indent=2))
+
+if __name__ == "__main__":
+    main()
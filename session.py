@@ -0,0 +1,120 @@
+from array import array
+
+from main import EightQueens
+
+class BoardSession:
+    """Interactive editing of an EightQueens board with O(1) moves and queries
+
+    The session keeps the queen count of every column and diagonal (as in
+    validate.count_conflicts) and the number of attacking pairs, so moving a
+    queen, asking how many conflicts a move would leave and checking a square
+    cost the same for any N. All edits of the board must go through the
+    session. Moves are logged as (row, old column, new column) in a flat
+    integer array for unlimited undo/redo; -1 is an empty row.
+    """
+
+    def __init__(self, eq=None, n=8):
+        self.eq = eq if eq is not None else EightQueens(n=n)
+        self.n = n = len(self.eq.queens)
+        self.cols = [0] * n
+        self.diags = [0] * (2 * n - 1)
+        self.anti_diags = [0] * (2 * n - 1)
+        self.conflicts = 0
+        self.placed = 0
+        self.log = array("l")
+        self.position = 0 # moves of the log currently applied
+        for row, col in enumerate(self.eq.queens):
+            if 0 <= col < n:
+                self._add(row, col)
+            else:
+                self.eq.queens[row] = -1
+
+    @property
+    def queens(self):
+        return self.eq.queens
+
+    def _add(self, row, col):
+        n = self.n
+        self.conflicts += self.cols[col] + self.diags[row - col + n - 1] + self.anti_diags[row + col]
+        self.cols[col] += 1
+        self.diags[row - col + n - 1] += 1
+        self.anti_diags[row + col] += 1
+        self.placed += 1
+
+    def _remove(self, row, col):
+        n = self.n
+        self.cols[col] -= 1
+        self.diags[row - col + n - 1] -= 1
+        self.anti_diags[row + col] -= 1
+        self.conflicts -= self.cols[col] + self.diags[row - col + n - 1] + self.anti_diags[row + col]
+        self.placed -= 1
+
+    def _apply(self, row, old, new):
+        if old != -1:
+            self._remove(row, old)
+        if new != -1:
+            self._add(row, new)
+        self.eq.queens[row] = new
+        self.eq.move_count += 1
+
+    def attacks(self, row, col):
+        """Number of queens of the other rows attacking the square (row, col)"""
+        n = self.n
+        count = self.cols[col] + self.diags[row - col + n - 1] + self.anti_diags[row + col]
+        if self.eq.queens[row] == col:
+            count -= 3 # the queen of this row shares no line with the other squares of the row
+        return count
+
+    def conflicts_if(self, row, col):
+        """Number of attacking pairs if the queen of row moved to col (-1 to take it off)"""
+        old = self.eq.queens[row]
+        conflicts = self.conflicts
+        if old != -1:
+            conflicts -= self.attacks(row, old)
+        if col != -1:
+            conflicts += self.attacks(row, col)
+        return conflicts
+
+    def is_safe(self, row, col):
+        """True if no queen of another row attacks the square (row, col)"""
+        return self.attacks(row, col) == 0
+
+    def safe_squares(self, row=None):
+        """Safe columns of one row, or (row, col) of every safe square of the board"""
+        if row is not None:
+            return [col for col in range(self.n) if self.is_safe(row, col)]
+        return [(r, col) for r in range(self.n) for col in range(self.n) if self.is_safe(r, col)]
+
+    def is_valid(self):
+        return self.placed == self.n and self.conflicts == 0
+
+    def move(self, row, col):
+        """Move the queen of row to col (-1 to take it off), return False if the move is off the board"""
+        if not 0 <= row < self.n or not -1 <= col < self.n:
+            return False
+        old = self.eq.queens[row]
+        if old == col:
+            return True
+        self._apply(row, old, col)
+        del self.log[3 * self.position:]
+        self.log.extend((row, old, col))
+        self.position += 1
+        return True
+
+    def undo(self):
+        """Take back the last move, return it as (row, old, new) or None if there is nothing to undo"""
+        if not self.position:
+            return None
+        self.position -= 1
+        row, old, new = self.log[3 * self.position:3 * self.position + 3]
+        self._apply(row, new, old)
+        return row, old, new
+
+    def redo(self):
+        """Apply the last undone move again, return it or None"""
+        if 3 * self.position == len(self.log):
+            return None
+        row, old, new = self.log[3 * self.position:3 * self.position + 3]
+        self.position += 1
+        self._apply(row, old, new)
+        return row, old, new
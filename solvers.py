@@ -0,0 +1,143 @@
+import importlib
+import time
+
+import instrument
+from moves import run_moves, with_conflicts
+from validate import count_conflicts
+
+# name -> (module, solver function)
+# modules are only imported when the solver is actually used
+SOLVERS = {
+    "backtracking": ("TanYitShen", "backtracking_alg"),
+    "dfs": ("AdrianChewTiongHong", "dfs_algorithm"),
+    "astar": ("BrianKamDingXian", "astar_search"),
+    "hill-climbing": ("YouJingHong", "steepest_ascent_hill_climbing"),
+    "simulated-annealing": ("ChengShinNie", "simulated_annealing"),
+    "genetic": ("ChongWeiXin", "genetic_algorithm"),
+    "ga-steady": ("ChongWeiXin", "steady_state_genetic_algorithm"),
+    "beam": ("beam", "beam_search"),
+    "stochastic-beam": ("beam", "stochastic_beam_search"),
+}
+
+# name -> generator version of the solver in the same module (see moves.py)
+MOVES = {
+    "backtracking": "backtracking_moves",
+    "dfs": "dfs_moves",
+    "astar": "astar_moves",
+    "hill-climbing": "hill_climbing_moves",
+    "simulated-annealing": "simulated_annealing_moves",
+    "genetic": "genetic_moves",
+    "ga-steady": "steady_state_moves",
+    "beam": "beam_moves",
+    "stochastic-beam": "stochastic_beam_moves",
+}
+
+# these solvers return the final list instead of updating eq
+RETURNS_BOARD = {"dfs", "hill-climbing"}
+
+# these solvers draw random numbers and take an rng argument (see rng.py)
+STOCHASTIC = {"simulated-annealing", "genetic", "ga-steady", "beam", "stochastic-beam"}
+
+def load_solver(name):
+    """Import the module of a solver and return (module, solver function)"""
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver '{name}', choose from: {', '.join(SOLVERS)}")
+    module_name, func_name = SOLVERS[name]
+    module = importlib.import_module(module_name)
+    return module, getattr(module, func_name)
+
+def load_moves(name):
+    """Import the module of a solver and return (module, move generator function)"""
+    module, solver = load_solver(name)
+    return module, getattr(module, MOVES[name])
+
+def _solver_kwargs(name, budget, seed):
+    kwargs = {}
+    if budget is not None:
+        budget.start()
+        kwargs["budget"] = budget
+    if seed is not None and name in STOCHASTIC:
+        kwargs["rng"] = seed
+    return kwargs
+
+def solve_moves(name, board, budget=None, seed=None):
+    """Yield the moves of one solver on a board as (row, old, new, conflicts)
+
+    Nothing is printed; stop early by closing the generator. Returns the
+    final board.
+    """
+    module, moves = load_moves(name)
+    eq = module.EightQueens(board)
+    kwargs = _solver_kwargs(name, budget, seed)
+    solution = yield from with_conflicts(moves(eq, **kwargs), eq.queens)
+    return list(solution if name in RETURNS_BOARD else eq.get_solution_list())
+
+def solve(name, board, quiet=True, budget=None, seed=None, trace=None):
+    """Run one solver on a board and return a result dictionary
+
+    If a Budget is given the solver stops when it runs out and the result
+    holds the best board it found with its conflict count. With instrument
+    enabled the result also holds the counters of this run. A seed makes the
+    stochastic solvers reproducible and is recorded in the result. With a
+    trace path every move is written to a binary move trace (see movetrace.py)
+    instead of being printed.
+    """
+    module, solver = load_solver(name)
+    eq = module.EightQueens(board)
+    kwargs = _solver_kwargs(name, budget, seed)
+
+    with instrument.run(name):
+        start_time = time.perf_counter()
+        if trace is not None:
+            from movetrace import TraceWriter
+
+            with TraceWriter(trace, eq.queens, name) as writer:
+                solution = run_moves(writer.record(getattr(module, MOVES[name])(eq, **kwargs)))
+        elif quiet:
+            # the move generator skips formatting the move messages nobody reads
+            solution = run_moves(getattr(module, MOVES[name])(eq, **kwargs))
+        else:
+            solution = solver(eq, **kwargs)
+        time_used = time.perf_counter() - start_time
+
+    if name in RETURNS_BOARD:
+        eq.set_queens(solution)
+
+    result = {
+        "solver": name,
+        "board": list(board),
+        "solution": list(eq.get_solution_list()),
+        "moves": eq.move_count,
+        "conflicts": count_conflicts(eq.queens),
+        "valid": eq.is_valid_queen_placement(),
+        "time": time_used,
+    }
+    if budget is not None:
+        result.update(budget.summary())
+    if instrument.ENABLED:
+        result["counters"] = instrument.snapshot()
+    if instrument.SAMPLE_EVERY and instrument.timeline:
+        result["timeline"] = list(instrument.timeline)
+    if seed is not None:
+        result["seed"] = seed
+    return result
+
+def solve_batch(name, boards, budget=None, seeds=None):
+    """Solve a list of boards with the same solver, one result dictionary per board
+
+    A board that makes the solver fail gets an {"error": ...} record instead,
+    so it does not take the other boards of the batch down with it.
+    """
+    seeds = seeds or [None] * len(boards)
+    results = []
+    for board, seed in zip(boards, seeds):
+        try:
+            results.append(solve(name, board, budget=budget, seed=seed))
+        except Exception as e:
+            results.append({"solver": name, "board": board, "error": repr(e)})
+    return results
+
+def warm_up(names=None):
+    """Import the solver modules ahead of time, used as a worker process initializer"""
+    for name in names or SOLVERS:
+        load_solver(name)
@@ -0,0 +1,221 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+# Persistent key/value store shared by processes, made of three files:
+#   <path>       append-only data file: records of (key length u32, value length u32, key, JSON value)
+#   <path>.idx   open-addressing hash index: header + capacity slots of (key hash u64, record offset + 1 u64)
+#   <path>.lock  flock'ed shared by readers and exclusively by the one writer
+# A later put of the same key appends a new record and points the index slot at it.
+
+DATA_MAGIC = b"NQST\x01\x00\x00\x00"
+INDEX_HEADER = struct.Struct("<8sQQQ") # magic, capacity, count, data bytes indexed
+INDEX_MAGIC = b"NQIX\x01\x00\x00\x00"
+RECORD = struct.Struct("<II")
+SLOT = struct.Struct("<QQ")
+MIN_CAPACITY = 1024
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+class Store:
+    """Append-only, memory-mapped store with a persistent hash index
+
+    Any number of processes can read at the same time, writes are serialized
+    with an exclusive lock. Values are anything json can encode.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_file = open(path + ".lock", "a+b")
+        self.data_map = None
+        self.index_map = None
+        self.index_id = None
+        with self._locked(fcntl.LOCK_EX):
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                with open(path, "wb") as f:
+                    f.write(DATA_MAGIC)
+            if not os.path.exists(path + ".idx"):
+                self._write_index(path + ".idx", MIN_CAPACITY, [], len(DATA_MAGIC))
+        self.data_file = open(path, "r+b")
+        if self.data_file.read(len(DATA_MAGIC)) != DATA_MAGIC:
+            raise ValueError(f"{path} is not a store file")
+
+    # locking and mapping
+
+    def _locked(self, mode):
+        store = self
+
+        class Lock:
+            def __enter__(self):
+                fcntl.flock(store.lock_file, mode)
+
+            def __exit__(self, *exc):
+                fcntl.flock(store.lock_file, fcntl.LOCK_UN)
+
+        return Lock()
+
+    def _map_index(self):
+        """(Re)map the index if a writer replaced it since we last looked"""
+        stat = os.stat(self.path + ".idx")
+        if self.index_id != (stat.st_ino, stat.st_size):
+            if self.index_map is not None:
+                self.index_map.close()
+            with open(self.path + ".idx", "r+b") as f:
+                self.index_map = mmap.mmap(f.fileno(), 0)
+            self.index_id = (stat.st_ino, stat.st_size)
+        return self.index_map
+
+    def _map_data(self, end):
+        """Map the data file so that bytes up to end are readable"""
+        if self.data_map is None or len(self.data_map) < end:
+            if self.data_map is not None:
+                self.data_map.close()
+            self.data_map = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.data_map
+
+    def _read_record(self, offset):
+        data = self._map_data(offset + RECORD.size)
+        key_length, value_length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        data = self._map_data(start + key_length + value_length)
+        return data[start:start + key_length], data[start + key_length:start + key_length + value_length]
+
+    # index
+
+    def _find(self, index, key, h):
+        """Return (slot number, record offset or None) for key"""
+        magic, capacity, count, indexed = INDEX_HEADER.unpack_from(index, 0)
+        slot = h % capacity
+        while True:
+            slot_hash, offset = SLOT.unpack_from(index, INDEX_HEADER.size + slot * SLOT.size)
+            if offset == 0:
+                return slot, None
+            if slot_hash == h and self._read_record(offset - 1)[0] == key:
+                return slot, offset - 1
+            slot = (slot + 1) % capacity
+
+    def _write_index(self, path, capacity, entries, indexed):
+        """Write a new index file with the given (hash, offset) entries"""
+        table = bytearray(INDEX_HEADER.size + capacity * SLOT.size)
+        INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, capacity, len(entries), indexed)
+        for h, offset in entries:
+            slot = h % capacity
+            while SLOT.unpack_from(table, INDEX_HEADER.size + slot * SLOT.size)[1] != 0:
+                slot = (slot + 1) % capacity
+            SLOT.pack_into(table, INDEX_HEADER.size + slot * SLOT.size, h, offset + 1)
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(table)
+        os.replace(temp, path)
+
+    def _insert(self, key, offset, end):
+        """Point key at the record at offset, growing the index when it gets half full"""
+        index = self._map_index()
+        h = key_hash(key)
+        slot, old = self._find(index, key, h)
+        magic, capacity, count, indexed = INDEX_HEADER.unpack_from(index, 0)
+        if old is None and (count + 1) * 2 > capacity:
+            entries = []
+            for i in range(capacity):
+                slot_hash, slot_offset = SLOT.unpack_from(index, INDEX_HEADER.size + i * SLOT.size)
+                if slot_offset:
+                    entries.append((slot_hash, slot_offset - 1))
+            entries.append((h, offset))
+            self._write_index(self.path + ".idx", capacity * 2, entries, end)
+            return
+        SLOT.pack_into(index, INDEX_HEADER.size + slot * SLOT.size, h, offset + 1)
+        INDEX_HEADER.pack_into(index, 0, magic, capacity, count + (old is None), end)
+
+    def _catch_up(self):
+        """Index records appended by a writer that stopped before indexing them"""
+        index = self._map_index()
+        indexed = INDEX_HEADER.unpack_from(index, 0)[3]
+        size = os.path.getsize(self.path)
+        while indexed < size:
+            end = size + 1
+            if indexed + RECORD.size <= size:
+                key_length, value_length = RECORD.unpack_from(self._map_data(size), indexed)
+                end = indexed + RECORD.size + key_length + value_length
+            if end > size:
+                # torn record from a writer that died mid-write, drop it
+                self.data_file.truncate(indexed)
+                break
+            key = self._read_record(indexed)[0]
+            self._insert(key, indexed, end)
+            indexed = end
+
+    # public API
+
+    def get(self, key, default=None):
+        key = key.encode()
+        with self._locked(fcntl.LOCK_SH):
+            index = self._map_index()
+            offset = self._find(index, key, key_hash(key))[1]
+            if offset is None:
+                return default
+            return json.loads(self._read_record(offset)[1])
+
+    def put(self, key, value):
+        key = key.encode()
+        value = json.dumps(value, separators=(",", ":")).encode()
+        with self._locked(fcntl.LOCK_EX):
+            self._catch_up()
+            offset = self.data_file.seek(0, os.SEEK_END)
+            self.data_file.write(RECORD.pack(len(key), len(value)) + key + value)
+            self.data_file.flush()
+            self._insert(key, offset, offset + RECORD.size + len(key) + len(value))
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        with self._locked(fcntl.LOCK_SH):
+            return INDEX_HEADER.unpack_from(self._map_index(), 0)[2]
+
+    def close(self):
+        if self.data_map is not None:
+            self.data_map.close()
+        if self.index_map is not None:
+            self.index_map.close()
+        self.data_file.close()
+        self.lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def board_key(solver, board):
+    return f"board:{solver}:{','.join(map(str, board))}"
+
+def solutions_key(n):
+    return f"solutions:{n}"
+
+def benchmark_key(name):
+    return f"benchmark:{name}"
+
+def solutions_for(store, n):
+    """The solution set of N, enumerated once with unique.py and then read from the store
+
+    The record is {"n", "total", "fundamental"}: one [canonical board, orbit
+    size] pair per symmetry class, an eighth of the full set (see expand_solutions).
+    """
+    record = store.get(solutions_key(n))
+    if record is None:
+        from unique import unique_solutions
+        fundamental = [[solution, size] for solution, size in unique_solutions(n)]
+        record = {"n": n, "total": sum(size for solution, size in fundamental), "fundamental": fundamental}
+        store.put(solutions_key(n), record)
+    return record
+
+def expand_solutions(record):
+    """Every solution of a solutions_for record, the images of each canonical board"""
+    from symmetry import SYMMETRIES
+
+    for solution, size in record["fundamental"]:
+        yield from sorted({tuple(symmetry(solution)) for symmetry, inverse in SYMMETRIES})
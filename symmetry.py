@@ -0,0 +1,90 @@
+# The 8 symmetries of the square board (the dihedral group D4) acting on
+# row-per-queen boards, queens[row] = col. Each one maps the cell (row, col)
+# to another cell of the N x N board.
+
+def identity(queens):
+    return list(queens)
+
+def mirror(queens):
+    """Reflect left-right: column c becomes N-1-c"""
+    n = len(queens)
+    return [n - 1 - col for col in queens]
+
+def flip(queens):
+    """Reflect top-bottom: row r becomes N-1-r"""
+    return list(reversed(queens))
+
+def rotate180(queens):
+    n = len(queens)
+    return [n - 1 - col for col in reversed(queens)]
+
+def transpose(queens):
+    """Reflect on the main diagonal: (r, c) becomes (c, r)"""
+    result = [-1] * len(queens)
+    for row, col in enumerate(queens):
+        result[col] = row
+    return result
+
+def anti_transpose(queens):
+    """Reflect on the anti-diagonal: (r, c) becomes (N-1-c, N-1-r)"""
+    n = len(queens)
+    result = [-1] * n
+    for row, col in enumerate(queens):
+        result[n - 1 - col] = n - 1 - row
+    return result
+
+def rotate90(queens):
+    """Rotate clockwise: (r, c) becomes (c, N-1-r)"""
+    n = len(queens)
+    result = [-1] * n
+    for row, col in enumerate(queens):
+        result[col] = n - 1 - row
+    return result
+
+def rotate270(queens):
+    """Rotate anti-clockwise: (r, c) becomes (N-1-c, r)"""
+    n = len(queens)
+    result = [-1] * n
+    for row, col in enumerate(queens):
+        result[n - 1 - col] = row
+    return result
+
+# (symmetry, inverse); the first 4 keep one queen per row for any board,
+# the other 4 only when the board is a permutation (one queen per column too)
+ROW_SYMMETRIES = [
+    (identity, identity),
+    (mirror, mirror),
+    (flip, flip),
+    (rotate180, rotate180),
+]
+SYMMETRIES = ROW_SYMMETRIES + [
+    (transpose, transpose),
+    (anti_transpose, anti_transpose),
+    (rotate90, rotate270),
+    (rotate270, rotate90),
+]
+
+def is_permutation(queens):
+    n = len(queens)
+    return sorted(queens) == list(range(n))
+
+def symmetries_for(queens):
+    """The symmetries that keep queens a valid row-per-queen board"""
+    return SYMMETRIES if is_permutation(queens) else ROW_SYMMETRIES
+
+def canonical(queens):
+    """Return (canonical board, symmetry, inverse), canonical being the smallest image of queens
+
+    symmetry maps boards in the orientation of queens to the canonical
+    orientation and inverse maps them back.
+    """
+    best = None
+    for symmetry, inverse in symmetries_for(queens):
+        image = symmetry(queens)
+        if best is None or image < best[0]:
+            best = (image, symmetry, inverse)
+    return best
+
+def orbit(queens):
+    """All distinct images of queens under the symmetries that keep the representation"""
+    return {tuple(symmetry(queens)) for symmetry, inverse in symmetries_for(queens)}
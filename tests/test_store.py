@@ -0,0 +1,17 @@
+from store import Store, expand_solutions, solutions_for, solutions_key
+from validate import is_valid
+
+def test_solution_set_round_trip(tmp_path):
+    path = str(tmp_path / "results.db")
+    with Store(path) as store:
+        record = solutions_for(store, 8)
+        assert record["total"] == 92
+        assert len(record["fundamental"]) == 12
+
+    # reopened, the store hands back the same record instead of enumerating again
+    with Store(path) as store:
+        assert store.get(solutions_key(8)) == record
+        assert solutions_for(store, 8) == record
+        solutions = list(expand_solutions(record))
+    assert len(solutions) == len(set(solutions)) == 92
+    assert all(is_valid(list(solution)) for solution in solutions)
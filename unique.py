@@ -0,0 +1,99 @@
+import argparse
+import sys
+import time
+
+from symmetry import SYMMETRIES
+
+# The fundamental solutions of N-Queens: one representative per class of
+# solutions under the 8 board symmetries. The representative is the canonical
+# board of symmetry.canonical, the lexicographically smallest image. With
+# a = queens[0] that board has no image with a smaller first entry, which
+# means the mirror image starts at N-1-a >= a and every queen on the board
+# edges (last row, first and last column) is at least a squares from the
+# corners. The search applies these constraints row by row and only the
+# complete boards that pass them are compared with their images.
+
+def unique_solutions(n):
+    """Yield (canonical solution, orbit size) for every symmetry class of solutions
+
+    The orbit size is the number of distinct solutions in the class (8, 4
+    or 2), so the sum of the orbit sizes is the total number of solutions.
+    """
+    if n == 1:
+        yield [0], 1
+        return
+    full = (1 << n) - 1
+    edges = 1 | 1 << (n - 1)
+    queens = [0] * n
+
+    for first in range((n - 1) // 2 + 1):
+        # the queens in the first and last column are a rows or more from the
+        # top and bottom, the queen in the last row a columns from the sides
+        allowed = [full] * n
+        for row in range(1, n):
+            if row < first or row > n - 1 - first:
+                allowed[row] &= ~edges
+        allowed[n - 1] &= full >> first & full << first
+        queens[0] = first
+        bit = 1 << first
+        tied = 2 * first == n - 1 # still equal to the mirror image so far
+        yield from _search(n, full, allowed, queens, 1, bit, bit << 1 & full, bit >> 1, tied)
+
+def _search(n, full, allowed, queens, row, cols, diag, anti, tied):
+    if row == n:
+        images = [symmetry(queens) for symmetry, inverse in SYMMETRIES]
+        if min(images) == queens:
+            yield list(queens), len({tuple(image) for image in images})
+        return
+    free = allowed[row] & ~(cols | diag | anti)
+    if tied:
+        # the mirror image must not become smaller: no column right of the middle
+        free &= (1 << n // 2 + n % 2) - 1
+    while free:
+        bit = free & -free
+        free ^= bit
+        col = bit.bit_length() - 1
+        queens[row] = col
+        yield from _search(n, full, allowed, queens, row + 1, cols | bit, (diag | bit) << 1 & full,
+                           (anti | bit) >> 1, tied and 2 * col == n - 1)
+
+def count_unique(n):
+    """Return (fundamental solutions, all solutions) for N"""
+    unique = total = 0
+    for solution, size in unique_solutions(n):
+        unique += 1
+        total += size
+    return unique, total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate the symmetry-distinct N-Queens solutions")
+    parser.add_argument("n", type=int)
+    parser.add_argument("-o", "--output", help="write one canonical solution and its orbit size per line")
+    parser.add_argument("--count", action="store_true", help="only print the counts")
+    parser.add_argument("--store", help="persistent store: enumerate N once and read it from the store afterwards")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    out = open(args.output, "w") if args.output else sys.stdout
+    unique = total = 0
+    if args.store:
+        from store import Store, solutions_for
+        with Store(args.store) as store:
+            solutions = solutions_for(store, args.n)["fundamental"]
+    else:
+        solutions = unique_solutions(args.n)
+    try:
+        for solution, size in solutions:
+            unique += 1
+            total += size
+            if args.output or not args.count:
+                out.write(f"{' '.join(map(str, solution))} {size}\n")
+    finally:
+        if args.output:
+            out.close()
+    time_used = time.perf_counter() - start_time
+    print(f"N = {args.n}: {unique} fundamental solutions, {total} in total, {time_used:.4f} seconds",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
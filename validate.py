@@ -0,0 +1,85 @@
+import sys
+
+def count_conflicts(queens):
+    """Number of attacking pairs of a board in O(N) with column/diagonal counters
+
+    Same count as the pairwise check in is_valid_queen_placement, but each
+    queen is added to three counters instead of being compared to every other
+    queen. Rows with no queen (-1 or out of range) are skipped.
+    """
+    n = len(queens)
+    cols = [0] * n
+    diags = [0] * (2 * n - 1)
+    anti_diags = [0] * (2 * n - 1)
+    conflicts = 0
+    for row, col in enumerate(queens):
+        if not 0 <= col < n:
+            continue
+        # every queen already on the same line attacks the new one
+        conflicts += cols[col] + diags[row - col + n - 1] + anti_diags[row + col]
+        cols[col] += 1
+        diags[row - col + n - 1] += 1
+        anti_diags[row + col] += 1
+    return conflicts
+
+def is_valid(queens):
+    """True if every row has a queen and no two queens attack each other"""
+    n = len(queens)
+    return all(0 <= col < n for col in queens) and count_conflicts(queens) == 0
+
+def check_board(board):
+    """Return the board as a list of columns or raise ValueError if it is not a board
+
+    A board is a non-empty list of integer columns, -1 for an empty row.
+    """
+    if not isinstance(board, (list, tuple)) or not board:
+        raise ValueError(f"a board must be a non-empty list of columns, got {board!r}")
+    n = len(board)
+    for row, col in enumerate(board):
+        if isinstance(col, bool) or not isinstance(col, int) or not -1 <= col < n:
+            raise ValueError(f"column {col!r} of row {row} is not -1 or in 0..{n - 1}")
+    return list(board)
+
+def validate_batch(boards, chunk_size=65536):
+    """Validate a (B, N) array of boards at once in O(B*N)
+
+    Returns (valid, conflicts): a boolean vector and the number of attacking
+    pairs of each board. Every board gets its own block of bins so one
+    bincount per line direction counts the queens of all boards together.
+    The boards are read chunk_size at a time in their own dtype (e.g. the
+    uint8/uint16 view of a corpus) and only each chunk is widened, so a
+    mapped corpus is never copied as a whole.
+    """
+    import numpy as np
+
+    boards = np.asarray(boards)
+    if boards.ndim != 2:
+        raise ValueError("boards must be a (B, N) array")
+    count, n = boards.shape
+    valid = np.zeros(count, dtype=bool)
+    conflicts = np.zeros(count, dtype=np.int64)
+
+    rows = np.arange(n)
+    bins = 2 * n # 2N-1 diagonals plus one bin for empty rows
+    for start in range(0, count, chunk_size):
+        chunk = boards[start:start + chunk_size].astype(np.int64)
+        size = len(chunk)
+        placed = (chunk >= 0) & (chunk < n)
+        offsets = (np.arange(size) * bins)[:, None]
+        part = conflicts[start:start + size]
+        for keys in (chunk, chunk - rows + n - 1, chunk + rows):
+            keys = np.where(placed, keys, bins - 1) + offsets
+            counts = np.bincount(keys.ravel(), minlength=size * bins).reshape(size, bins)[:, :-1]
+            part += (counts * (counts - 1) // 2).sum(axis=1)
+        valid[start:start + size] = placed.all(axis=1) & (part == 0)
+    return valid, conflicts
+
+if __name__ == "__main__":
+    # usage: python validate.py boards.nqc -> count of valid boards in a corpus
+    from corpus import Corpus
+    with Corpus(sys.argv[1]) as corpus:
+        boards = corpus.array()
+        valid, conflicts = validate_batch(boards)
+        print(f"Valid: {int(valid.sum())}/{len(corpus)}")
+        print(f"Average Conflicts: {conflicts.mean() if len(conflicts) else 0:.2f}")
+        del boards